@@ -1,9 +1,13 @@
 from fastapi import APIRouter
 from .cars import router as cars_router
+from .ops import router as ops_router
+from .sync import router as sync_router
 from .users import router as users_router
 
 router = APIRouter()
+router.include_router(ops_router)
 router.include_router(users_router)
 router.include_router(cars_router)
+router.include_router(sync_router)
 
 __all__ = ["router"]
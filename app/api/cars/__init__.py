@@ -1,7 +1,10 @@
 from fastapi import APIRouter
-from . import car_routes
+from . import car_routes, export_routes, search_routes, stats_routes
 
 router = APIRouter(prefix="/cars", tags=["cars"])
+router.include_router(stats_routes.router)
+router.include_router(search_routes.router)
+router.include_router(export_routes.router)
 router.include_router(car_routes.router)
 
 __all__ = ["router"]
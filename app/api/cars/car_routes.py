@@ -1,62 +1,435 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from neo4j import AsyncSession
-from app.core.database import get_db
-from app.repositories.car_repository import CarRepository
-from app.api.cars.car_schema import CarCreate, CarUpdate, CarResponse
+from typing import Any, AsyncIterator, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from neo4j import AsyncSession, READ_ACCESS
+from neo4j.exceptions import Neo4jError
+from pydantic import ValidationError
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, driver, session_config
+from app.repositories.car_repository import CarRepository, car_loader
+from app.api.cars.car_schema import (
+    CarCreate,
+    CarUpdate,
+    CarResponse,
+    CarFilters,
+    BulkCarResult,
+    BulkCarResponse,
+    BulkDeleteRequest,
+    BulkDeleteResponse,
+)
+from app.api.cars.etags import (
+    cache_headers,
+    etag_matches,
+    make_etag,
+    not_modified,
+    representation,
+)
+from app.api.cars.pagination import encode_cursor, decode_cursor
+from app.core.admission import admit_bulk, admit_reads, admit_writes, rate_limit_user
 from app.core.security import get_current_user
+from app.core.serialization import ndjson_line, render
+from app.core.cache import car_cache, redis_client
+from app.core.events import notify_catalog_changed
+from app.core.stats import catalog_stats
+from app.core.versions import Version, catalog_versions
+from app.repositories.catalog_snapshot import CatalogSnapshot, catalog_snapshot
+import orjson
 import uuid
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 router = APIRouter()
 
 
-async def fetch_car_or_404(car_id: str, session: AsyncSession) -> dict:
-    repo = CarRepository(session)
-    car_record = await repo.get_car(car_id)
+async def fetch_car_or_404(
+    car_id: str, snapshot: CatalogSnapshot | None, version: Version | None
+) -> dict:
+    if snapshot is not None:
+        car_record = snapshot.get_car(car_id)
+    else:
+        token = version.token if version else None
+        car_record = await car_cache.get_car(
+            car_id, token, lambda: car_loader.load((car_id, token))
+        )
     if not car_record:
         raise HTTPException(status_code=404, detail="Car not found")
     return car_record
 
 
-@router.post("/", response_model=CarResponse)
+async def fetch_cars(
+    car_ids: list[str], snapshot: CatalogSnapshot | None, versions: list[Version] | None
+) -> list[dict]:
+    if snapshot is not None:
+        cars = {car_id: snapshot.get_car(car_id) for car_id in car_ids}
+    else:
+        tokens = (
+            {car_id: version.token for car_id, version in zip(car_ids, versions)}
+            if versions is not None
+            else {}
+        )
+        cars = await car_cache.get_cars(
+            car_ids, tokens, lambda missing: load_cars(missing, tokens)
+        )
+    return [cars[car_id] for car_id in car_ids if cars.get(car_id)]
+
+
+async def load_cars(car_ids: list[str], tokens: dict[str, str | None]) -> dict[str, dict]:
+    loaded = await car_loader.load_all((car_id, tokens.get(car_id)) for car_id in car_ids)
+    return {car_id: car for (car_id, _), car in loaded.items()}
+
+
+async def read_car_versions(
+    car_ids: list[str], snapshot: CatalogSnapshot | None
+) -> list[Version] | None:
+    # The live counters may already be ahead of a snapshot that is still being
+    # rebuilt, so snapshot reads are labelled with the snapshot's own version.
+    if snapshot is not None:
+        return None if snapshot.version is None else [snapshot.version] * len(car_ids)
+    return await catalog_versions.cars(car_ids)
+
+
+def parse_ids(ids: str) -> list[str]:
+    car_ids = list(dict.fromkeys(car_id.strip() for car_id in ids.split(",") if car_id.strip()))
+    if not car_ids:
+        raise HTTPException(status_code=400, detail="ids must contain at least one car id")
+    if len(car_ids) > settings.MULTI_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.MULTI_GET_MAX_IDS} ids per request"
+        )
+    return car_ids
+
+
+def stats_row(car_record: dict) -> dict:
+    return {
+        "make_name": car_record["make"],
+        "model_name": car_record["model"],
+        "year": car_record["year"],
+    }
+
+
+@router.post(
+    "/",
+    response_model=CarResponse,
+    dependencies=[Depends(admit_writes), Depends(rate_limit_user)],
+)
 async def create_car(
+    request: Request,
     car_data: CarCreate,
     session: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     repo = CarRepository(session)
     car_id = str(uuid.uuid4())
-    await repo.create_make(car_data.make_name)
-    await repo.create_model(car_data.model_name, car_data.make_name)
     car_record = await repo.create_car(
         car_id, car_data.year, car_data.model_name, car_data.make_name
     )
     if not car_record:
         raise HTTPException(status_code=500, detail="Failed to create car")
-    return car_record
+    await catalog_stats.record(added=[stats_row(car_record)])
+    await notify_catalog_changed(redis_client, [car_record["id"]], car_cache)
+    return render(request, car_record)
 
 
-@router.get("/", response_model=List[CarResponse])
-async def list_cars(
-    limit: int = 10,
+async def stream_cars_ndjson(after: Optional[str], filters: CarFilters, limit: Optional[int]):
+    async with driver.session(**session_config(READ_ACCESS)) as session:
+        repo = CarRepository(session)
+        async for car_record in repo.stream_cars(after, filters, limit):
+            yield ndjson_line(car_record)
+
+
+async def iter_bulk_items(request: Request) -> AsyncIterator[Any]:
+    if NDJSON_MEDIA_TYPE in request.headers.get("content-type", ""):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield parse_ndjson_line(line)
+        if buffer.strip():
+            yield parse_ndjson_line(buffer)
+        return
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    # Checked before anything is yielded, so an oversized array writes nothing.
+    if len(payload) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {settings.BULK_MAX_ITEMS} items per request"
+        )
+    for item in payload:
+        yield item
+
+
+def parse_ndjson_line(line: bytes) -> Any:
+    try:
+        return orjson.loads(line)
+    except ValueError as e:
+        return e
+
+
+async def write_bulk_chunk(
+    repo: CarRepository, chunk: list[tuple[int, Any]], results: list[BulkCarResult]
+):
+    valid = []
+    for index, item in chunk:
+        if isinstance(item, ValueError):
+            results.append(
+                BulkCarResult(index=index, status="invalid", errors=[{"msg": f"Invalid JSON: {item}"}])
+            )
+            continue
+        try:
+            car_data = CarCreate.model_validate(item)
+        except ValidationError as e:
+            results.append(
+                BulkCarResult(
+                    index=index,
+                    status="invalid",
+                    errors=e.errors(include_url=False, include_context=False),
+                )
+            )
+            continue
+        valid.append(
+            (
+                index,
+                {
+                    "id": str(uuid.uuid4()),
+                    "year": car_data.year,
+                    "model_name": car_data.model_name,
+                    "make_name": car_data.make_name,
+                },
+            )
+        )
+
+    if not valid:
+        return
+
+    try:
+        await repo.create_cars_bulk([row for _, row in valid])
+    except Neo4jError as e:
+        results.extend(
+            BulkCarResult(index=index, status="failed", errors=[{"msg": e.message}])
+            for index, _ in valid
+        )
+    else:
+        results.extend(
+            BulkCarResult(index=index, status="created", id=row["id"]) for index, row in valid
+        )
+        await catalog_stats.record(added=[row for _, row in valid])
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkCarResponse,
+    dependencies=[Depends(admit_bulk), Depends(rate_limit_user)],
+)
+async def bulk_create_cars(
+    request: Request,
     session: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     repo = CarRepository(session)
-    return await repo.list_cars(limit)
+    results: list[BulkCarResult] = []
+    chunk: list[tuple[int, Any]] = []
 
+    try:
+        async for index, item in aenumerate(iter_bulk_items(request)):
+            if index >= settings.BULK_MAX_ITEMS:
+                # Earlier chunks of an NDJSON stream are already committed, so
+                # stop reading and report the cut-off instead of failing.
+                results.append(
+                    BulkCarResult(
+                        index=index,
+                        status="rejected",
+                        errors=[
+                            {
+                                "msg": f"At most {settings.BULK_MAX_ITEMS} items per "
+                                "request; this and later items were not read"
+                            }
+                        ],
+                    )
+                )
+                break
+            chunk.append((index, item))
+            if len(chunk) >= settings.BULK_CHUNK_SIZE:
+                await write_bulk_chunk(repo, chunk, results)
+                chunk = []
+        if chunk:
+            await write_bulk_chunk(repo, chunk, results)
+    finally:
+        # Whatever was committed must reach the cache and ETags, even if a
+        # later chunk raised.
+        created_ids = [result.id for result in results if result.id is not None]
+        if created_ids:
+            await notify_catalog_changed(redis_client, created_ids, car_cache)
 
-@router.get("/{car_id}", response_model=CarResponse)
+    results.sort(key=lambda result: result.index)
+    return BulkCarResponse(
+        created=len(created_ids),
+        invalid=sum(1 for result in results if result.status == "invalid"),
+        failed=sum(1 for result in results if result.status == "failed"),
+        rejected=sum(1 for result in results if result.status == "rejected"),
+        results=results,
+    )
+
+
+@router.post(
+    "/bulk-delete",
+    response_model=BulkDeleteResponse,
+    dependencies=[Depends(admit_bulk), Depends(rate_limit_user)],
+)
+async def bulk_delete_cars(
+    delete_data: BulkDeleteRequest,
+    session: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    car_ids = list(dict.fromkeys(delete_data.ids))
+    if len(car_ids) > settings.BULK_DELETE_MAX_IDS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {settings.BULK_DELETE_MAX_IDS} ids per request"
+        )
+
+    repo = CarRepository(session)
+    deleted = await repo.delete_cars(car_ids, batch_size=settings.BULK_CHUNK_SIZE)
+    deleted_ids = {row["id"] for row in deleted}
+    if deleted:
+        await catalog_stats.record(removed=deleted)
+        await notify_catalog_changed(redis_client, deleted_ids, car_cache)
+    return BulkDeleteResponse(
+        deleted=len(deleted),
+        not_found=[car_id for car_id in car_ids if car_id not in deleted_ids],
+    )
+
+
+async def aenumerate(items: AsyncIterator[Any]) -> AsyncIterator[tuple[int, Any]]:
+    index = 0
+    async for item in items:
+        yield index, item
+        index += 1
+
+
+@router.get(
+    "/",
+    response_model=List[CarResponse],
+    dependencies=[Depends(admit_reads), Depends(rate_limit_user)],
+)
+async def list_cars(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    make: Optional[str] = None,
+    model: Optional[str] = None,
+    year_min: Optional[int] = None,
+    year_max: Optional[int] = None,
+    ids: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    if ids is not None:
+        car_ids = parse_ids(ids)
+        snapshot = catalog_snapshot.snapshot
+        headers: dict[str, str] = {}
+        car_versions = await read_car_versions(car_ids, snapshot)
+        if car_versions is not None:
+            etag = make_etag(
+                max(car_versions, key=lambda version: version.version),
+                representation(request),
+                *(
+                    f"{car_id}:{version.version}"
+                    for car_id, version in zip(car_ids, car_versions)
+                ),
+            )
+            modified = [version.modified for version in car_versions if version.modified]
+            headers = cache_headers(etag, max(modified, default=None))
+            if etag_matches(request, etag):
+                return not_modified(headers)
+        cars = await fetch_cars(car_ids, snapshot, car_versions)
+        return render(request, cars, headers=headers)
+
+    after = decode_cursor(cursor) if cursor else None
+    filters = CarFilters(make=make, model=model, year_min=year_min, year_max=year_max)
+
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return StreamingResponse(
+            stream_cars_ndjson(after, filters, limit), media_type=NDJSON_MEDIA_TYPE
+        )
+
+    limit = limit or 10
+    # The version is read before the data, so a concurrent write can only make
+    # the ETag stale, never label old data with the new version.
+    headers = {}
+    snapshot = catalog_snapshot.snapshot
+    if snapshot is not None:
+        catalog_version = snapshot.version
+    else:
+        catalog_version = await catalog_versions.catalog()
+    if catalog_version is not None:
+        etag = make_etag(
+            catalog_version,
+            representation(request),
+            orjson.dumps(
+                {"limit": limit, "after": after, **filters.model_dump()},
+                option=orjson.OPT_SORT_KEYS,
+            ).decode(),
+        )
+        headers = cache_headers(etag, catalog_version.modified)
+        if etag_matches(request, etag):
+            return not_modified(headers)
+
+    if snapshot is not None:
+        cars = snapshot.list_cars(limit, after, filters)
+    else:
+        repo = CarRepository(session)
+        cache_params = {"limit": limit, "after": after, **filters.model_dump()}
+        cars = await car_cache.list_cars(
+            cache_params, lambda: repo.list_cars(limit, after, filters)
+        )
+    if len(cars) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(cars[-1]["id"])
+    return render(request, cars, headers=headers)
+
+
+@router.get(
+    "/cache/stats",
+    dependencies=[Depends(admit_reads), Depends(rate_limit_user)],
+)
+async def cache_stats(current_user: dict = Depends(get_current_user)):
+    return car_cache.stats()
+
+
+@router.get(
+    "/{car_id}",
+    response_model=CarResponse,
+    dependencies=[Depends(admit_reads), Depends(rate_limit_user)],
+)
 async def get_car(
+    request: Request,
     car_id: str,
-    session: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    return await fetch_car_or_404(car_id, session)
+    snapshot = catalog_snapshot.snapshot
+    headers: dict[str, str] = {}
+    car_versions = await read_car_versions([car_id], snapshot)
+    if car_versions is not None:
+        etag = make_etag(car_versions[0], representation(request), car_id)
+        headers = cache_headers(etag, car_versions[0].modified)
+        if etag_matches(request, etag):
+            return not_modified(headers)
+    version = car_versions[0] if car_versions is not None else None
+    return render(request, await fetch_car_or_404(car_id, snapshot, version), headers=headers)
 
 
-@router.put("/{car_id}", response_model=CarResponse)
+@router.put(
+    "/{car_id}",
+    response_model=CarResponse,
+    dependencies=[Depends(admit_writes), Depends(rate_limit_user)],
+)
 async def replace_car(
+    request: Request,
     car_id: str,
     car_data: CarCreate,
     session: AsyncSession = Depends(get_db),
@@ -66,11 +439,19 @@ async def replace_car(
     car_record = await repo.replace_car(car_id, car_data)
     if not car_record:
         raise HTTPException(status_code=500, detail="Failed to replace car")
-    return car_record
+    previous = car_record.pop("previous")
+    await catalog_stats.record(added=[stats_row(car_record)], removed=[previous])
+    await notify_catalog_changed(redis_client, [car_id], car_cache)
+    return render(request, car_record)
 
 
-@router.patch("/{car_id}", response_model=CarResponse)
+@router.patch(
+    "/{car_id}",
+    response_model=CarResponse,
+    dependencies=[Depends(admit_writes), Depends(rate_limit_user)],
+)
 async def update_car(
+    request: Request,
     car_id: str,
     update_data: CarUpdate,
     session: AsyncSession = Depends(get_db),
@@ -80,10 +461,16 @@ async def update_car(
     car_record = await repo.update_car(car_id, update_data)
     if not car_record:
         raise HTTPException(status_code=404, detail="Car not found during update")
-    return car_record
+    previous = car_record.pop("previous")
+    await catalog_stats.record(added=[stats_row(car_record)], removed=[previous])
+    await notify_catalog_changed(redis_client, [car_id], car_cache)
+    return render(request, car_record)
 
 
-@router.delete("/{car_id}")
+@router.delete(
+    "/{car_id}",
+    dependencies=[Depends(admit_writes), Depends(rate_limit_user)],
+)
 async def delete_car(
     car_id: str,
     session: AsyncSession = Depends(get_db),
@@ -93,4 +480,6 @@ async def delete_car(
     result = await repo.delete_car(car_id)
     if not result:
         raise HTTPException(status_code=404, detail="Car not found")
+    await catalog_stats.record(removed=[result])
+    await notify_catalog_changed(redis_client, [car_id], car_cache)
     return {"detail": f"Car {car_id} deleted successfully"}
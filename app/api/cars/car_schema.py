@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, List, Optional
 
 
 class CarCreate(BaseModel):
@@ -14,8 +14,39 @@ class CarUpdate(BaseModel):
     model_name: Optional[str] = Field(None, description="Updated model")
 
 
+class CarFilters(BaseModel):
+    make: Optional[str] = Field(None, description="Exact make name")
+    model: Optional[str] = Field(None, description="Exact model name")
+    year_min: Optional[int] = Field(None, description="Earliest manufacturing year")
+    year_max: Optional[int] = Field(None, description="Latest manufacturing year")
+
+
 class CarResponse(BaseModel):
     id: str
     year: int
     make: str
     model: str
+
+
+class BulkCarResult(BaseModel):
+    index: int
+    status: str
+    id: Optional[str] = None
+    errors: Optional[List[Any]] = None
+
+
+class BulkCarResponse(BaseModel):
+    created: int
+    invalid: int
+    failed: int
+    rejected: int
+    results: List[BulkCarResult]
+
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, description="Ids of the cars to delete")
+
+
+class BulkDeleteResponse(BaseModel):
+    deleted: int
+    not_found: List[str]
@@ -0,0 +1,36 @@
+import hashlib
+from email.utils import formatdate
+from fastapi import Request, Response
+from app.core.serialization import accepts_msgpack
+from app.core.versions import Version
+
+
+def representation(request: Request) -> str:
+    return "msgpack" if accepts_msgpack(request) else "json"
+
+
+def make_etag(version: Version, *parts: str) -> str:
+    digest = hashlib.sha1("\x1f".join(parts).encode()).hexdigest()[:16]
+    return f'W/"{version.epoch}-{version.version}-{digest}"'
+
+
+def cache_headers(etag: str, modified: float | None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if modified is not None:
+        headers["Last-Modified"] = formatdate(modified, usegmt=True)
+    return headers
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison; gzip may also have re-tagged it.
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,30 @@
+from typing import AsyncIterator, Literal
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from neo4j import READ_ACCESS
+from app.core.admission import admit_bulk, rate_limit_user
+from app.core.database import driver, session_config
+from app.core.export import EXPORT_MEDIA_TYPES, export_chunks
+from app.core.security import get_current_user
+from app.repositories.car_repository import CarRepository
+
+router = APIRouter()
+
+
+async def stream_export(export_format: str) -> AsyncIterator[bytes]:
+    async with driver.session(**session_config(READ_ACCESS)) as session:
+        repo = CarRepository(session)
+        async for chunk in export_chunks(repo.export_cars(), export_format):
+            yield chunk
+
+
+@router.get("/export", dependencies=[Depends(admit_bulk), Depends(rate_limit_user)])
+async def export_cars(
+    format: Literal["csv", "ndjson", "parquet"] = Query("ndjson"),
+    current_user: dict = Depends(get_current_user)
+):
+    return StreamingResponse(
+        stream_export(format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="cars.{format}"'},
+    )
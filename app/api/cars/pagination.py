@@ -0,0 +1,19 @@
+import base64
+import json
+from fastapi import HTTPException
+
+
+def encode_cursor(last_id: str) -> str:
+    payload = json.dumps({"after": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded))["after"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(after, str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return after
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query
+from neo4j import AsyncSession
+from app.core.admission import admit_reads, rate_limit_user
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.core.security import get_current_user
+from app.repositories.catalog_search import catalog_search, search_fulltext
+
+router = APIRouter(dependencies=[Depends(admit_reads), Depends(rate_limit_user)])
+
+
+@router.get("/search")
+async def search_catalog(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    fuzzy: bool = True,
+    session: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    index = catalog_search.index
+    results = index.search(q, limit, fuzzy) if index is not None else []
+    if not results and settings.SEARCH_FULLTEXT_FALLBACK:
+        results = await search_fulltext(session, q, limit)
+    return results
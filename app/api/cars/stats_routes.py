@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends
+from app.core.admission import admit_reads, rate_limit_user
+from app.core.security import get_current_user
+from app.core.stats import catalog_stats
+
+router = APIRouter(dependencies=[Depends(admit_reads), Depends(rate_limit_user)])
+
+
+@router.get("/stats")
+async def get_stats(current_user: dict = Depends(get_current_user)):
+    cars_by_make = await catalog_stats.cars_by_make()
+    return {
+        "total_cars": sum(cars_by_make.values()),
+        "cars_by_make": cars_by_make,
+        "models_by_make": await catalog_stats.models_by_make(),
+        "cars_by_year": await catalog_stats.cars_by_year(),
+    }
+
+
+@router.get("/stats/makes")
+async def get_make_stats(current_user: dict = Depends(get_current_user)):
+    cars_by_make = await catalog_stats.cars_by_make()
+    models_by_make = await catalog_stats.models_by_make()
+    return [
+        {"make": make, "cars": cars, "models": models_by_make.get(make, 0)}
+        for make, cars in cars_by_make.items()
+    ]
+
+
+@router.get("/stats/years")
+async def get_year_stats(current_user: dict = Depends(get_current_user)):
+    cars_by_year = await catalog_stats.cars_by_year()
+    return [{"year": year, "cars": cars} for year, cars in cars_by_year.items()]
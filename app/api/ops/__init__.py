@@ -0,0 +1,7 @@
+from fastapi import APIRouter
+from .ops_routes import router as ops_router
+
+router = APIRouter(tags=["ops"])
+router.include_router(ops_router)
+
+__all__ = ["router"]
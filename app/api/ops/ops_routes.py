@@ -0,0 +1,53 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from app.core.cache import car_cache, redis_client
+from app.core.database import driver
+from app.core.metrics import CACHE_LOOKUPS
+from app.core.query_log import slow_query_log
+from app.core.security import get_current_user
+
+router = APIRouter()
+
+HEALTH_CHECK_TIMEOUT_SECONDS = 2.0
+
+
+async def check_dependency(check) -> str:
+    try:
+        await asyncio.wait_for(check(), HEALTH_CHECK_TIMEOUT_SECONDS)
+    except Exception as e:
+        return f"error: {type(e).__name__}"
+    return "ok"
+
+
+@router.get("/health")
+async def health():
+    neo4j_status, redis_status = await asyncio.gather(
+        check_dependency(driver.verify_connectivity),
+        check_dependency(redis_client.ping),
+    )
+    checks = {"neo4j": neo4j_status, "redis": redis_status}
+    healthy = all(status == "ok" for status in checks.values())
+    return JSONResponse(
+        status_code=200 if healthy else 503,
+        content={"status": "ok" if healthy else "unavailable", **checks},
+    )
+
+
+@router.get("/metrics")
+async def metrics():
+    cache_stats = car_cache.stats()
+    for outcome in ("hits", "misses", "errors"):
+        CACHE_LOOKUPS.labels(outcome).set(cache_stats[outcome])
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@router.get("/ops/slow-queries")
+async def slow_queries(
+    name: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(get_current_user)
+):
+    return slow_query_log.recent(name, limit)
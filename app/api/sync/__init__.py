@@ -0,0 +1,7 @@
+from fastapi import APIRouter
+from .sync_routes import router as sync_router
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+router.include_router(sync_router)
+
+__all__ = ["router"]
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.admission import admit_reads, rate_limit_user
+from app.core.security import get_current_user
+from app.core.sync_runs import sync_runs
+
+router = APIRouter(dependencies=[Depends(admit_reads), Depends(rate_limit_user)])
+
+
+@router.get("/runs")
+async def list_sync_runs(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    return await sync_runs.history(limit)
+
+
+@router.get("/runs/{run_id}")
+async def get_sync_run(run_id: str, current_user: dict = Depends(get_current_user)):
+    run = await sync_runs.get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Sync run not found")
+    return run
@@ -1,26 +1,31 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException
 from neo4j import AsyncSession
+from neo4j.exceptions import ConstraintError
 
-from app.core.database import get_db
+from app.core.admission import admit_auth
+from app.core.database import get_db, get_read_db
 from app.repositories.user_repository import UserRepository
 from app.api.users.user_schema import UserCreate, UserLogin, UserRead, TokenResponse
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import (
+    verify_password_async,
+    get_password_hash_async,
+    create_access_token,
+)
 from app.core.config import settings
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(admit_auth)])
 
 
 @router.post("/register", response_model=UserRead)
 async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     repo = UserRepository(db)
 
-    existing = await repo.get_user_by_username(user.username)
-    if existing:
+    hashed_pw = await get_password_hash_async(user.password)
+    try:
+        created = await repo.create_user(user.username, user.email, hashed_pw)
+    except ConstraintError:
         raise HTTPException(status_code=400, detail="Username already taken")
-
-    hashed_pw = get_password_hash(user.password)
-    created = await repo.create_user(user.username, user.email, hashed_pw)
     if not created:
         raise HTTPException(status_code=500, detail="User creation failed")
 
@@ -28,14 +33,14 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_read_db)):
     repo = UserRepository(db)
 
     db_user = await repo.get_user_by_username(user.username)
     if not db_user:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
-    if not verify_password(user.password, db_user["password_hash"]):
+    if not await verify_password_async(user.password, db_user["password_hash"]):
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -4,6 +4,8 @@ from .security import (
     create_access_token,
     verify_password,
     get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
 )
 
 __all__ = [
@@ -12,4 +14,6 @@ __all__ = [
     "create_access_token",
     "verify_password",
     "get_password_hash",
+    "verify_password_async",
+    "get_password_hash_async",
 ]
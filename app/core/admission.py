@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import AsyncIterator, Callable
+from fastapi import Depends, HTTPException
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from app.core.cache import redis_client
+from app.core.config import settings
+from app.core.metrics import ADMISSION_IN_FLIGHT, ADMISSION_REJECTIONS
+from app.core.security import get_current_user
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('hmget', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('hset', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('expire', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+def overloaded(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionLimiter:
+    # A concurrency limit with a bounded FIFO of waiters. A waiter gives up at
+    # its deadline, and when the queue is full requests are shed immediately,
+    # so overload turns into fast 503s instead of an unbounded pile-up on the
+    # Neo4j connection pool.
+    def __init__(self, name: str, limit: int, max_queue: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self):
+        if self.active < self.limit and not self._waiters:
+            self._admit()
+            return
+        if len(self._waiters) >= self.max_queue:
+            ADMISSION_REJECTIONS.labels(self.name, "queue_full").inc()
+            raise overloaded(f"Too many concurrent {self.name} requests", self.timeout)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on.
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                ADMISSION_REJECTIONS.labels(self.name, "timeout").inc()
+                raise overloaded(f"Timed out waiting for a {self.name} slot", self.timeout)
+            raise
+
+    def release(self):
+        # Hand the slot straight to the oldest live waiter, keeping FIFO order.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+        ADMISSION_IN_FLIGHT.labels(self.name).dec()
+
+    def _admit(self):
+        self.active += 1
+        ADMISSION_IN_FLIGHT.labels(self.name).inc()
+
+
+class TokenBucket:
+    # Per-user request rate shared by every API process through Redis. Fails
+    # open: if Redis is unavailable, requests are only bound by the local
+    # concurrency limits.
+    def __init__(self, client: Redis, rate: float, burst: int):
+        self.client = client
+        self.rate = rate
+        self.burst = burst
+
+    async def take(self, key: str) -> float:
+        try:
+            wait = await self.client.eval(
+                TOKEN_BUCKET_SCRIPT, 1, f"ratelimit:{key}", self.rate, self.burst, time.time()
+            )
+        except RedisError as e:
+            logger.warning("Rate limiter unavailable: %s", e)
+            return 0.0
+        return float(wait)
+
+
+limiters = {
+    "auth": AdmissionLimiter(
+        "auth",
+        settings.ADMISSION_AUTH_CONCURRENCY,
+        settings.ADMISSION_AUTH_QUEUE,
+        settings.ADMISSION_AUTH_TIMEOUT_SECONDS,
+    ),
+    "reads": AdmissionLimiter(
+        "reads",
+        settings.ADMISSION_READS_CONCURRENCY,
+        settings.ADMISSION_READS_QUEUE,
+        settings.ADMISSION_READS_TIMEOUT_SECONDS,
+    ),
+    "writes": AdmissionLimiter(
+        "writes",
+        settings.ADMISSION_WRITES_CONCURRENCY,
+        settings.ADMISSION_WRITES_QUEUE,
+        settings.ADMISSION_WRITES_TIMEOUT_SECONDS,
+    ),
+    "bulk": AdmissionLimiter(
+        "bulk",
+        settings.ADMISSION_BULK_CONCURRENCY,
+        settings.ADMISSION_BULK_QUEUE,
+        settings.ADMISSION_BULK_TIMEOUT_SECONDS,
+    ),
+}
+
+user_rate_limit = TokenBucket(
+    redis_client, settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST
+)
+
+
+def admit(route_class: str) -> Callable[[], AsyncIterator[None]]:
+    limiter = limiters[route_class]
+
+    async def dependency() -> AsyncIterator[None]:
+        if not settings.ADMISSION_ENABLED:
+            yield
+            return
+        await limiter.acquire()
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    return dependency
+
+
+async def rate_limit_user(current_user: dict = Depends(get_current_user)):
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    wait = await user_rate_limit.take(current_user["id"])
+    if wait > 0:
+        ADMISSION_REJECTIONS.labels("user", "rate_limited").inc()
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+
+admit_auth = admit("auth")
+admit_reads = admit("reads")
+admit_writes = admit("writes")
+admit_bulk = admit("bulk")
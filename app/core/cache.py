@@ -0,0 +1,225 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable, Iterator
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CAR_KEY = "cache:car:v3:{car_id}"
+LIST_GENERATION_KEY = "cache:cars:generation"
+LIST_KEY = "cache:cars:v2:{generation}:{digest}"
+INVALIDATE_CHUNK_SIZE = 1000
+
+redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+cache_redis_client = (
+    Redis.from_url(settings.CACHE_REDIS_URL, decode_responses=True)
+    if settings.CACHE_REDIS_URL
+    else redis_client
+)
+
+
+class LRUCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: str):
+        self._data.pop(key, None)
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        return ((key, value) for key, (_, value) in list(self._data.items()))
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CarCache:
+    def __init__(self, client: Redis):
+        self.client = client
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    # Car entries store the version token the reader saw before loading, and
+    # are only served to readers holding the same token. A load that started
+    # before a write can therefore never be served after the version bump,
+    # even if its SET lands after invalidate(). Without a token (version
+    # counters unavailable) the cache is bypassed.
+    async def get_car(
+        self,
+        car_id: str,
+        version: str | None,
+        loader: Callable[[], Awaitable[dict[str, Any] | None]],
+    ) -> dict[str, Any] | None:
+        cars = await self.get_cars(
+            [car_id], {car_id: version}, lambda _: _load_one(car_id, loader)
+        )
+        return cars.get(car_id)
+
+    async def get_cars(
+        self,
+        car_ids: list[str],
+        versions: dict[str, str | None],
+        loader: Callable[[list[str]], Awaitable[dict[str, dict[str, Any]]]],
+    ) -> dict[str, dict[str, Any]]:
+        cars: dict[str, dict[str, Any]] = {}
+        cacheable = [car_id for car_id in car_ids if versions.get(car_id) is not None]
+        if settings.CACHE_ENABLED and cacheable:
+            try:
+                cached = await self.client.mget(
+                    [CAR_KEY.format(car_id=car_id) for car_id in cacheable]
+                )
+            except RedisError as e:
+                self._on_error(e)
+                cached = [None] * len(cacheable)
+            for car_id, raw in zip(cacheable, cached):
+                if raw is None:
+                    continue
+                entry = json.loads(raw)
+                if entry["version"] == versions[car_id]:
+                    cars[car_id] = entry["car"]
+            self.hits += len(cars)
+            self.misses += len(cacheable) - len(cars)
+
+        missing = [car_id for car_id in car_ids if car_id not in cars]
+        if not missing:
+            return cars
+
+        loaded = await loader(missing)
+        cars.update(loaded)
+        writable = {
+            car_id: car for car_id, car in loaded.items() if versions.get(car_id) is not None
+        }
+        if settings.CACHE_ENABLED and writable:
+            try:
+                async with self.client.pipeline(transaction=False) as pipe:
+                    for car_id, car in writable.items():
+                        pipe.set(
+                            CAR_KEY.format(car_id=car_id),
+                            json.dumps({"version": versions[car_id], "car": car}),
+                            ex=settings.CAR_CACHE_TTL_SECONDS,
+                        )
+                    await pipe.execute()
+            except RedisError as e:
+                self._on_error(e)
+        return cars
+
+    async def list_cars(
+        self,
+        params: dict[str, Any],
+        loader: Callable[[], Awaitable[list[dict[str, Any]]]],
+    ) -> list[dict[str, Any]]:
+        key = None
+        if settings.CACHE_ENABLED:
+            try:
+                generation = await self.client.get(LIST_GENERATION_KEY) or "0"
+                digest = hashlib.sha1(
+                    json.dumps(params, sort_keys=True).encode()
+                ).hexdigest()
+                key = LIST_KEY.format(generation=generation, digest=digest)
+            except RedisError as e:
+                self._on_error(e)
+
+        if key is not None:
+            cached = await self._get(key)
+            if cached is not None:
+                return cached
+
+        cars = await loader()
+        if key is not None:
+            await self._set(key, cars, settings.CAR_LIST_CACHE_TTL_SECONDS)
+        return cars
+
+    async def invalidate(self, car_ids: Iterable[str] = (), lists: bool = True):
+        if not settings.CACHE_ENABLED:
+            return
+        keys = [CAR_KEY.format(car_id=car_id) for car_id in car_ids]
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for start in range(0, len(keys), INVALIDATE_CHUNK_SIZE):
+                    pipe.delete(*keys[start:start + INVALIDATE_CHUNK_SIZE])
+                if lists:
+                    pipe.incr(LIST_GENERATION_KEY)
+                await pipe.execute()
+        except RedisError as e:
+            self._on_error(e)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    async def _get(self, key: str) -> Any:
+        if not settings.CACHE_ENABLED:
+            return None
+        try:
+            raw = await self.client.get(key)
+        except RedisError as e:
+            self._on_error(e)
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def _set(self, key: str, value: Any, ttl: int):
+        if not settings.CACHE_ENABLED:
+            return
+        try:
+            await self.client.set(key, json.dumps(value), ex=ttl)
+        except RedisError as e:
+            self._on_error(e)
+
+    def _on_error(self, error: RedisError):
+        self.errors += 1
+        logger.warning("Car cache unavailable: %s", error)
+
+
+async def _load_one(
+    car_id: str, loader: Callable[[], Awaitable[dict[str, Any] | None]]
+) -> dict[str, dict[str, Any]]:
+    car = await loader()
+    return {} if car is None else {car_id: car}
+
+
+car_cache = CarCache(cache_redis_client)
+
+
+async def close_cache():
+    if cache_redis_client is not redis_client:
+        await cache_redis_client.aclose()
+    await redis_client.aclose()
@@ -5,17 +5,82 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_ALGORITHM: str = "HS256"
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
 
     NEO4J_URI: str
     NEO4J_USER: str
     NEO4J_PASSWORD: str
+    NEO4J_DATABASE: str | None = None
+    NEO4J_MAX_POOL_SIZE: int = 100
+    NEO4J_ACQUISITION_TIMEOUT: float = 60.0
+    NEO4J_MAX_CONNECTION_LIFETIME: float = 3600.0
+    NEO4J_FETCH_SIZE: int = 1000
+    NEO4J_WARMUP_CONNECTIONS: int = 10
 
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
 
+    REDIS_URL: str = "redis://localhost:6379/1"
+    # Evictable cache keys; defaults to REDIS_URL. Locks, sync state and the
+    # Celery broker must stay on a noeviction instance.
+    CACHE_REDIS_URL: str | None = None
+    CACHE_ENABLED: bool = True
+    CAR_CACHE_TTL_SECONDS: int = 300
+    CAR_LIST_CACHE_TTL_SECONDS: int = 60
+    CATALOG_SNAPSHOT_ENABLED: bool = False
+    SEARCH_FULLTEXT_FALLBACK: bool = False
+    MULTI_GET_MAX_IDS: int = 100
+    GZIP_MINIMUM_SIZE: int = 1024
+    EXPORT_CHUNK_ROWS: int = 5000
+    EXPORT_PARQUET_ROW_GROUP_SIZE: int = 100000
+    EXPORT_PARQUET_COMPRESSION: str = "snappy"
+    EXPORT_DIR: str = "exports"
+
     CAR_API_ID: str
     CAR_MASTER_KEY: str
 
+    BULK_CHUNK_SIZE: int = 500
+    BULK_MAX_ITEMS: int = 50000
+    BULK_DELETE_MAX_IDS: int = 50000
+    MAINTENANCE_BATCH_SIZE: int = 10000
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_AUTH_CONCURRENCY: int = 8
+    ADMISSION_AUTH_QUEUE: int = 32
+    ADMISSION_AUTH_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_READS_CONCURRENCY: int = 64
+    ADMISSION_READS_QUEUE: int = 256
+    ADMISSION_READS_TIMEOUT_SECONDS: float = 1.0
+    ADMISSION_WRITES_CONCURRENCY: int = 16
+    ADMISSION_WRITES_QUEUE: int = 64
+    ADMISSION_WRITES_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_BULK_CONCURRENCY: int = 2
+    ADMISSION_BULK_QUEUE: int = 4
+    ADMISSION_BULK_TIMEOUT_SECONDS: float = 5.0
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_PER_SECOND: float = 20.0
+    RATE_LIMIT_BURST: int = 40
+
+    SYNC_BATCH_SIZE: int = 1000
+    SYNC_PAGE_SIZE: int = 1000
+    SYNC_QUEUE_SIZE: int = 4
+    SYNC_WRITERS: int = 3
+    SYNC_SHARDS: int = 8
+    SYNC_LOCK_TTL_SECONDS: int = 600
+    SYNC_RUN_TTL_SECONDS: int = 86400
+    SYNC_HISTORY_SIZE: int = 50
+    SYNC_MAX_RETRIES: int = 5
+    SYNC_RETRY_BACKOFF_MAX_SECONDS: int = 300
+    SYNC_MAX_STALE_FRACTION: float = 0.2
+
+    WORKER_METRICS_PORT: int | None = None
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_PLAN_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_LOG_SIZE: int = 200
+
     class Config:
         env_file = ".env"
         extra = "ignore"
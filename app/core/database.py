@@ -1,17 +1,57 @@
-from neo4j import AsyncGraphDatabase
-from typing import AsyncGenerator
+import asyncio
+import logging
+from neo4j import AsyncDriver, AsyncGraphDatabase, READ_ACCESS, WRITE_ACCESS
+from typing import Any, AsyncGenerator
 from app.core.config import settings
 
-driver = AsyncGraphDatabase.driver(
-    settings.NEO4J_URI,
-    auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
-)
+logger = logging.getLogger(__name__)
+
+
+def create_driver() -> AsyncDriver:
+    return AsyncGraphDatabase.driver(
+        settings.NEO4J_URI,
+        auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+        max_connection_pool_size=settings.NEO4J_MAX_POOL_SIZE,
+        connection_acquisition_timeout=settings.NEO4J_ACQUISITION_TIMEOUT,
+        max_connection_lifetime=settings.NEO4J_MAX_CONNECTION_LIFETIME,
+    )
+
+
+def session_config(access_mode: str = WRITE_ACCESS) -> dict[str, Any]:
+    return {
+        "database": settings.NEO4J_DATABASE,
+        "default_access_mode": access_mode,
+        "fetch_size": settings.NEO4J_FETCH_SIZE,
+    }
+
+
+driver = create_driver()
 
 
 async def get_db() -> AsyncGenerator:
-    async with driver.session() as session:
+    async with driver.session(**session_config(WRITE_ACCESS)) as session:
         yield session
 
 
+async def get_read_db() -> AsyncGenerator:
+    async with driver.session(**session_config(READ_ACCESS)) as session:
+        yield session
+
+
+async def _ping(access_mode: str):
+    async with driver.session(**session_config(access_mode)) as session:
+        result = await session.run("RETURN 1")
+        await result.consume()
+
+
+async def warm_up(connections: int = settings.NEO4J_WARMUP_CONNECTIONS):
+    await driver.verify_connectivity()
+    await asyncio.gather(
+        _ping(WRITE_ACCESS),
+        *(_ping(READ_ACCESS) for _ in range(max(connections - 1, 0))),
+    )
+    logger.info("Neo4j driver warmed up with %d connections", connections)
+
+
 async def close_driver():
     await driver.close()
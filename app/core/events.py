@@ -0,0 +1,169 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Iterable
+from neo4j import AsyncDriver
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from app.core.cache import CarCache, redis_client
+from app.core.versions import CatalogVersions
+
+logger = logging.getLogger(__name__)
+
+CATALOG_CHANNEL = "catalog:changed"
+MAX_PUBLISHED_IDS = 1000
+RECONNECT_DELAY_SECONDS = 1.0
+SUBSCRIBE_TIMEOUT_SECONDS = 5.0
+REBUILD_RETRY_DELAY_SECONDS = 1.0
+REBUILD_RETRY_MAX_DELAY_SECONDS = 60.0
+
+CatalogHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+async def publish_catalog_changed(client: Redis, car_ids: list[str]):
+    payload = {
+        "count": len(car_ids),
+        "car_ids": car_ids if len(car_ids) <= MAX_PUBLISHED_IDS else None,
+    }
+    try:
+        await client.publish(CATALOG_CHANNEL, json.dumps(payload))
+    except RedisError as e:
+        logger.warning("Could not publish catalog change: %s", e)
+
+
+async def notify_catalog_changed(client: Redis, car_ids: Iterable[str], cache: CarCache):
+    # The cache lives on its own Redis (CACHE_REDIS_URL), so it is passed in
+    # rather than derived from the state client.
+    # Invalidate before bumping, so a reader that sees the new catalog version
+    # also reads the new list generation. Per-car entries do not depend on this
+    # order: each stores the version token its load started from and is only
+    # served under that same token, which is also the one in the ETag.
+    car_ids = list(car_ids)
+    await cache.invalidate(car_ids)
+    await CatalogVersions(client).bump(car_ids)
+    await publish_catalog_changed(client, car_ids)
+
+
+class CatalogListener:
+    def __init__(self, client: Redis):
+        self.client = client
+        self._handlers: list[CatalogHandler] = []
+        self._task: asyncio.Task | None = None
+        self._subscribed = asyncio.Event()
+        self._resync = False
+
+    def add_handler(self, handler: CatalogHandler):
+        self._handlers.append(handler)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def wait_subscribed(self, timeout: float = SUBSCRIBE_TIMEOUT_SECONDS):
+        # Called before the initial loads, so no change published while they
+        # run is missed. If Redis is not reachable yet, startup goes on and
+        # handlers get a full resync once the subscription is up.
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout)
+        except asyncio.TimeoutError:
+            if not self._subscribed.is_set():
+                logger.warning("Catalog listener not subscribed yet, will resync")
+                self._resync = True
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(CATALOG_CHANNEL)
+                    self._subscribed.set()
+                    if self._resync:
+                        self._resync = False
+                        await self._dispatch({"count": None, "car_ids": None})
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            await self._dispatch(json.loads(message["data"]))
+            except RedisError as e:
+                logger.warning("Catalog listener disconnected: %s", e)
+                self._subscribed.clear()
+                self._resync = True
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def _dispatch(self, payload: dict[str, Any]):
+        for handler in self._handlers:
+            try:
+                await handler(payload)
+            except Exception:
+                logger.exception("Catalog change handler failed")
+
+
+class CatalogRefresher(ABC):
+    def __init__(self):
+        self._driver: AsyncDriver | None = None
+        self._task: asyncio.Task | None = None
+        self._dirty = False
+        self._loading = False
+
+    async def load(self, driver: AsyncDriver):
+        # Changes that arrive during the initial build only mark the refresher
+        # dirty, and are applied by a rebuild once it is done.
+        self._loading = True
+        try:
+            await self.rebuild(driver)
+        finally:
+            self._loading = False
+        self._driver = driver
+        self._schedule()
+
+    async def on_catalog_changed(self, payload: dict[str, Any]):
+        self._dirty = True
+        self._schedule()
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    @abstractmethod
+    async def rebuild(self, driver: AsyncDriver):
+        ...
+
+    def _schedule(self):
+        if self._loading or self._driver is None or not self._dirty:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._rebuild_until_clean())
+
+    async def _rebuild_until_clean(self):
+        # A failed rebuild leaves the refresher dirty and is retried with
+        # backoff, rather than serving a stale copy until the next change.
+        delay = REBUILD_RETRY_DELAY_SECONDS
+        while self._dirty and self._driver is not None:
+            self._dirty = False
+            try:
+                await self.rebuild(self._driver)
+            except Exception:
+                logger.exception(
+                    "%s rebuild failed, retrying in %.0fs", type(self).__name__, delay
+                )
+                self._dirty = True
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, REBUILD_RETRY_MAX_DELAY_SECONDS)
+            else:
+                delay = REBUILD_RETRY_DELAY_SECONDS
+
+
+catalog_listener = CatalogListener(redis_client)
@@ -0,0 +1,118 @@
+import csv
+import io
+from typing import Any, AsyncIterator, Callable
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+from app.core.config import settings
+
+EXPORT_COLUMNS = ("id", "year", "make", "model")
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+Rows = AsyncIterator[dict[str, Any]]
+
+
+async def iter_csv(rows: Rows, chunk_rows: int) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    pending = 0
+    async for row in rows:
+        writer.writerow([row[column] for column in EXPORT_COLUMNS])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
+
+
+async def iter_ndjson(rows: Rows, chunk_rows: int) -> AsyncIterator[bytes]:
+    lines: list[bytes] = []
+    async for row in rows:
+        lines.append(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE))
+        if len(lines) >= chunk_rows:
+            yield b"".join(lines)
+            lines = []
+    if lines:
+        yield b"".join(lines)
+
+
+class _ChunkSink(io.RawIOBase):
+    # ParquetWriter only appends, so the bytes of each finished row group can be
+    # handed to the caller and dropped instead of building the file in memory.
+    def __init__(self):
+        super().__init__()
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self.position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def iter_parquet(rows: Rows, row_group_rows: int) -> AsyncIterator[bytes]:
+    schema = pa.schema(
+        [
+            ("id", pa.string()),
+            ("year", pa.int32()),
+            ("make", pa.string()),
+            ("model", pa.string()),
+        ]
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression=settings.EXPORT_PARQUET_COMPRESSION)
+    columns: dict[str, list[Any]] = {column: [] for column in EXPORT_COLUMNS}
+
+    def flush_row_group() -> bytes:
+        table = pa.Table.from_pydict(columns, schema=schema)
+        writer.write_table(table, row_group_size=table.num_rows)
+        for values in columns.values():
+            values.clear()
+        return sink.drain()
+
+    try:
+        async for row in rows:
+            for column in EXPORT_COLUMNS:
+                columns[column].append(row[column])
+            if len(columns["id"]) >= row_group_rows:
+                yield flush_row_group()
+        if columns["id"]:
+            yield flush_row_group()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+EXPORTERS: dict[str, Callable[[Rows, int], AsyncIterator[bytes]]] = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+    "parquet": iter_parquet,
+}
+
+
+def export_chunks(rows: Rows, export_format: str) -> AsyncIterator[bytes]:
+    chunk_rows = (
+        settings.EXPORT_PARQUET_ROW_GROUP_SIZE
+        if export_format == "parquet"
+        else settings.EXPORT_CHUNK_ROWS
+    )
+    return EXPORTERS[export_format](rows, chunk_rows)
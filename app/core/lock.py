@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+EXTEND_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LockLost(RuntimeError):
+    pass
+
+
+class RedisLock:
+    # A single-key lock whose value is the owner's token, so only the owner can
+    # extend or release it. The token can be handed to other tasks, which lets
+    # one logical run hold the lock across several Celery tasks.
+    def __init__(self, client: Redis, key: str, ttl_ms: int, token: str | None = None):
+        self.client = client
+        self.key = key
+        self.ttl_ms = ttl_ms
+        self.token = token or uuid.uuid4().hex
+
+    async def acquire(self) -> bool:
+        return bool(await self.client.set(self.key, self.token, nx=True, px=self.ttl_ms))
+
+    async def extend(self) -> bool:
+        return bool(await self.client.eval(EXTEND_SCRIPT, 1, self.key, self.token, self.ttl_ms))
+
+    async def release(self) -> bool:
+        return bool(await self.client.eval(RELEASE_SCRIPT, 1, self.key, self.token))
+
+    async def owner(self) -> str | None:
+        return await self.client.get(self.key)
+
+    @asynccontextmanager
+    async def hold(self) -> AsyncIterator[None]:
+        # Keeps the lock alive while the block runs. If an extension finds the
+        # lock gone or taken over, the block is cancelled and LockLost raised.
+        if not await self.extend():
+            raise LockLost(self.key)
+
+        owner_task = asyncio.current_task()
+        lost = False
+
+        async def heartbeat():
+            nonlocal lost
+            while True:
+                await asyncio.sleep(self.ttl_ms / 3000)
+                if not await self.extend():
+                    logger.error("Lost lock %s held by token %s", self.key, self.token)
+                    lost = True
+                    owner_task.cancel()  # type: ignore[union-attr]
+                    return
+
+        beat = asyncio.create_task(heartbeat())
+        try:
+            yield
+        except asyncio.CancelledError:
+            if lost:
+                owner_task.uncancel()  # type: ignore[union-attr]
+                raise LockLost(self.key)
+            raise
+        finally:
+            beat.cancel()
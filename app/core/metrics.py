@@ -0,0 +1,113 @@
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.query_log import slow_query_log
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ["method", "route", "status"],
+)
+NEO4J_QUERY_DURATION = Histogram(
+    "neo4j_query_duration_seconds",
+    "Neo4j query latency by repository query name",
+    ["query"],
+)
+NEO4J_QUERY_ROWS = Histogram(
+    "neo4j_query_rows",
+    "Rows returned per Neo4j query",
+    ["query"],
+    buckets=(0, 1, 10, 100, 1000, 10000, 100000),
+)
+NEO4J_QUERY_ERRORS = Counter(
+    "neo4j_query_errors_total",
+    "Failed Neo4j queries by repository query name and error type",
+    ["query", "error"],
+)
+SYNC_PHASE_DURATION = Histogram(
+    "sync_phase_duration_seconds",
+    "Car sync time per page by phase",
+    ["phase"],
+)
+CACHE_LOOKUPS = Gauge(
+    "car_cache_lookups",
+    "Car cache lookups in this process by outcome",
+    ["outcome"],
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Requests currently admitted per route class",
+    ["route_class"],
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total",
+    "Requests shed by admission control per route class and reason",
+    ["route_class", "reason"],
+)
+
+
+class QueryTracker:
+    __slots__ = ("name", "query", "params", "rows", "summary", "streaming", "first_row_at")
+
+    def __init__(self, name: str, query: str, params: dict[str, Any], streaming: bool = False):
+        self.name = name
+        self.query = query
+        self.params = params
+        self.rows = 0
+        self.summary: Any = None
+        self.streaming = streaming
+        self.first_row_at: float | None = None
+
+    def stream_row(self):
+        if self.first_row_at is None:
+            self.first_row_at = time.perf_counter()
+        self.rows += 1
+
+
+@asynccontextmanager
+async def track_query(
+    name: str, query: str, params: dict[str, Any], streaming: bool = False
+) -> AsyncIterator[QueryTracker]:
+    # A streaming query is consumed at the client's pace, so it is timed to its
+    # first row; anything later measures the reader, not Neo4j.
+    tracker = QueryTracker(name, query, params, streaming)
+    started = time.perf_counter()
+    try:
+        yield tracker
+    except Exception as e:
+        NEO4J_QUERY_ERRORS.labels(name, type(e).__name__).inc()
+        raise
+    finally:
+        elapsed = (tracker.first_row_at or time.perf_counter()) - started
+        NEO4J_QUERY_DURATION.labels(name).observe(elapsed)
+        NEO4J_QUERY_ROWS.labels(name).observe(tracker.rows)
+        slow_query_log.observe(tracker, elapsed)
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status)).observe(
+                time.perf_counter() - started
+            )
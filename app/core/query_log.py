@@ -0,0 +1,124 @@
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any
+from neo4j import AsyncDriver, READ_ACCESS, WRITE_ACCESS
+from app.core.config import settings
+from app.core.database import session_config
+
+if TYPE_CHECKING:
+    from app.core.metrics import QueryTracker
+
+logger = logging.getLogger(__name__)
+
+WRITE_CLAUSES = re.compile(r"\b(CREATE|MERGE|DELETE|SET|REMOVE|FOREACH|LOAD CSV)\b", re.IGNORECASE)
+
+
+def param_shape(value: Any) -> str:
+    if isinstance(value, list):
+        inner = param_shape(value[0]) if value else "?"
+        return f"list[{inner}] x{len(value)}"
+    if isinstance(value, dict):
+        return "map{" + ", ".join(sorted(value)) + "}"
+    return type(value).__name__
+
+
+def summary_counters(summary: Any) -> dict[str, Any]:
+    if summary is None:
+        return {}
+    counters = {
+        key: value
+        for key, value in vars(summary.counters).items()
+        if not key.startswith("_") and value
+    }
+    return {
+        "counters": counters,
+        "available_after_ms": summary.result_available_after,
+        "consumed_after_ms": summary.result_consumed_after,
+    }
+
+
+def plan_operators(plan: dict[str, Any]) -> list[dict[str, Any]]:
+    operators = [
+        {
+            "operator": plan.get("operatorType"),
+            "db_hits": plan.get("dbHits"),
+            "rows": plan.get("rows"),
+            "details": plan.get("args", plan.get("arguments", {})).get("Details"),
+        }
+    ]
+    for child in plan.get("children", []):
+        operators.extend(plan_operators(child))
+    return operators
+
+
+class SlowQueryLog:
+    def __init__(self, maxlen: int):
+        self.entries: deque[dict[str, Any]] = deque(maxlen=maxlen)
+        self.driver: AsyncDriver | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def observe(self, tracker: "QueryTracker", elapsed: float):
+        duration_ms = elapsed * 1000
+        if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+            return
+
+        entry = {
+            "timestamp": time.time(),
+            "name": tracker.name,
+            "duration_ms": round(duration_ms, 3),
+            "rows": tracker.rows,
+            "query": tracker.query.strip(),
+            "param_shapes": {key: param_shape(value) for key, value in tracker.params.items()},
+            **summary_counters(tracker.summary),
+            "streaming": tracker.streaming,
+            "plan": None,
+        }
+        self.entries.append(entry)
+        logger.warning("slow_query %s", json.dumps(entry, default=str))
+
+        # Streaming queries scan the whole catalog; profiling one would run a
+        # second full scan on the API's driver.
+        if (
+            self.driver is not None
+            and not tracker.streaming
+            and random.random() < settings.SLOW_QUERY_PLAN_SAMPLE_RATE
+        ):
+            task = asyncio.create_task(self._capture_plan(entry, tracker.params))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def recent(self, name: str | None = None, limit: int = 50) -> list[dict[str, Any]]:
+        entries = [entry for entry in reversed(self.entries) if name is None or entry["name"] == name]
+        return entries[:limit]
+
+    async def _capture_plan(self, entry: dict[str, Any], params: dict[str, Any]):
+        # PROFILE executes the statement, so only read queries are profiled;
+        # writes get an EXPLAIN plan with estimated rows instead of db hits.
+        is_write = WRITE_CLAUSES.search(entry["query"]) is not None
+        mode = "EXPLAIN" if is_write else "PROFILE"
+        access_mode = WRITE_ACCESS if is_write else READ_ACCESS
+        try:
+            async with self.driver.session(**session_config(access_mode)) as session:  # type: ignore[union-attr]
+                result = await session.run(f"{mode} {entry['query']}", params)  # type: ignore[arg-type]
+                summary = await result.consume()
+            plan = summary.profile if mode == "PROFILE" else summary.plan
+            operators = plan_operators(plan or {})
+            entry["plan"] = {
+                "mode": mode,
+                "total_db_hits": sum(op["db_hits"] or 0 for op in operators),
+                "operators": operators,
+            }
+            logger.warning(
+                "slow_query_plan %s",
+                json.dumps({"name": entry["name"], "plan": entry["plan"]}, default=str),
+            )
+        except Exception as e:
+            logger.warning("Could not capture plan for slow query %s: %s", entry["name"], e)
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE)
@@ -0,0 +1,253 @@
+import argparse
+import asyncio
+import logging
+import sys
+from neo4j import AsyncDriver
+from redis.asyncio import Redis
+from app.core.config import settings
+from app.core.database import create_driver, session_config
+from app.core.lock import RedisLock
+
+logger = logging.getLogger(__name__)
+
+# The original sync CREATEd a new Car on every run. Keep one node per id: the
+# newest copy (highest internal id) wins, older copies only fill in missing
+# properties and its model link, then are deleted.
+DEDUPE_CARS_STATEMENT = """
+MATCH (c:Car)
+WHERE c.id IS NOT NULL
+WITH c.id AS car_id, count(*) AS copies
+WHERE copies > 1
+CALL {
+    WITH car_id
+    MATCH (c:Car {id: car_id})
+    WITH c ORDER BY id(c) DESC
+    WITH collect(c) AS cars
+    WITH head(cars) AS keep, tail(cars) AS dups
+    WITH keep, dups, properties(keep) AS newest
+    FOREACH (dup IN reverse(dups) | SET keep += properties(dup))
+    SET keep += newest
+    WITH keep, dups
+    CALL {
+        WITH keep, dups
+        WITH keep, dups WHERE NOT (keep)-[:INSTANCE_OF]->(:CarModel)
+        UNWIND dups AS dup
+        MATCH (dup)-[:INSTANCE_OF]->(cm:CarModel)
+        WITH keep, cm LIMIT 1
+        MERGE (keep)-[:INSTANCE_OF]->(cm)
+    }
+    FOREACH (dup IN dups | DETACH DELETE dup)
+} IN TRANSACTIONS OF 1000 ROWS
+"""
+
+# The original MERGE (cm:CarModel {name}) shared one model node between every
+# make with a model of that name. Such nodes are split into one node per
+# (make, name). Cars only pointed at the shared node, so their make is unknown:
+# they are linked to the first make's copy and lose source_hash, which makes
+# the next sync rewrite them onto the right model. Migration 2 has already
+# given such nodes one arbitrary make_name; it is removed first so the copies
+# can be MERGEd against car_model_key.
+SPLIT_SHARED_MODELS_STATEMENTS = [
+    """
+    MATCH (cm:CarModel)-[:BELONGS_TO]->(m:Make)
+    WITH cm, count(DISTINCT m) AS makes
+    WHERE makes > 1
+    SET cm:SharedCarModel
+    REMOVE cm.make_name
+    """,
+    """
+    MATCH (cm:SharedCarModel)-[:BELONGS_TO]->(m:Make)
+    MERGE (copy:CarModel {make_name: m.name, name: cm.name})
+    MERGE (copy)-[:BELONGS_TO]->(m)
+    """,
+    """
+    MATCH (c:Car)-[r:INSTANCE_OF]->(cm:SharedCarModel)
+    CALL {
+        WITH c, r, cm
+        MATCH (cm)-[:BELONGS_TO]->(m:Make)
+        WITH c, r, cm, m ORDER BY m.name LIMIT 1
+        MATCH (copy:CarModel {make_name: m.name, name: cm.name})
+        MERGE (c)-[:INSTANCE_OF]->(copy)
+        DELETE r
+        REMOVE c.source_hash
+    } IN TRANSACTIONS OF 1000 ROWS
+    """,
+    "MATCH (cm:SharedCarModel) DETACH DELETE cm",
+]
+
+MIGRATIONS: list[tuple[int, str, list[str]]] = [
+    (
+        1,
+        "uniqueness constraints on natural keys",
+        [
+            DEDUPE_CARS_STATEMENT,
+            "CREATE CONSTRAINT car_id_unique IF NOT EXISTS "
+            "FOR (c:Car) REQUIRE c.id IS UNIQUE",
+            "CREATE CONSTRAINT make_name_unique IF NOT EXISTS "
+            "FOR (m:Make) REQUIRE m.name IS UNIQUE",
+            "CREATE CONSTRAINT user_id_unique IF NOT EXISTS "
+            "FOR (u:User) REQUIRE u.id IS UNIQUE",
+            "CREATE CONSTRAINT user_username_unique IF NOT EXISTS "
+            "FOR (u:User) REQUIRE u.username IS UNIQUE",
+        ],
+    ),
+    (
+        2,
+        "car models keyed by (make_name, name)",
+        [
+            "MATCH (cm:CarModel)-[:BELONGS_TO]->(m:Make) "
+            "WHERE cm.make_name IS NULL SET cm.make_name = m.name",
+            "CREATE CONSTRAINT car_model_key IF NOT EXISTS "
+            "FOR (cm:CarModel) REQUIRE (cm.make_name, cm.name) IS UNIQUE",
+        ],
+    ),
+    (
+        3,
+        "lookup indexes for filters and sync",
+        [
+            "CREATE INDEX car_year IF NOT EXISTS FOR (c:Car) ON (c.year)",
+            "CREATE INDEX car_source IF NOT EXISTS FOR (c:Car) ON (c.source)",
+            "CREATE INDEX car_model_name IF NOT EXISTS FOR (cm:CarModel) ON (cm.name)",
+        ],
+    ),
+    (
+        4,
+        "full-text index for make and model search",
+        [
+            "CREATE FULLTEXT INDEX catalog_names IF NOT EXISTS "
+            "FOR (n:Make|CarModel) ON EACH [n.name]",
+        ],
+    ),
+    (
+        5,
+        "split car models shared across makes",
+        SPLIT_SHARED_MODELS_STATEMENTS,
+    ),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+MIGRATION_LOCK_KEY = "schema:migration:lock"
+MIGRATION_LOCK_TTL_MS = 60_000
+MIGRATION_LOCK_POLL_SECONDS = 1.0
+
+EXPECTED_CONSTRAINTS = {
+    "car_id_unique",
+    "make_name_unique",
+    "user_id_unique",
+    "user_username_unique",
+    "car_model_key",
+}
+EXPECTED_INDEXES = {"car_year", "car_source", "car_model_name", "catalog_names"}
+
+
+async def get_schema_version(driver: AsyncDriver) -> int:
+    async with driver.session(**session_config()) as session:
+        result = await session.run(
+            "MATCH (s:SchemaMigration) RETURN coalesce(max(s.version), 0) AS version"
+        )
+        record = await result.single()
+        return record["version"] if record else 0
+
+
+async def apply_migrations(driver: AsyncDriver) -> int:
+    # Every API process and worker calls this at startup. The repair
+    # statements are not safe to run concurrently, so pending migrations run
+    # under a Redis lock and the version is re-read once it is held; processes
+    # that waited then find nothing left to do.
+    if await get_schema_version(driver) >= SCHEMA_VERSION:
+        return SCHEMA_VERSION
+
+    client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    lock = RedisLock(client, MIGRATION_LOCK_KEY, MIGRATION_LOCK_TTL_MS)
+    try:
+        while not await lock.acquire():
+            logger.info("Waiting for schema migrations run by %s", await lock.owner())
+            await asyncio.sleep(MIGRATION_LOCK_POLL_SECONDS)
+        try:
+            async with lock.hold():
+                return await _apply_pending(driver)
+        finally:
+            await lock.release()
+    finally:
+        await client.aclose()
+
+
+async def _apply_pending(driver: AsyncDriver) -> int:
+    current = await get_schema_version(driver)
+    async with driver.session(**session_config()) as session:
+        for version, description, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            logger.info("Applying schema migration %d: %s", version, description)
+            for statement in statements:
+                result = await session.run(statement)  # type: ignore[arg-type]
+                await result.consume()
+            result = await session.run(
+                "MERGE (s:SchemaMigration {version: $version}) "
+                "SET s.description = $description, s.applied_at = datetime()",
+                version=version,
+                description=description,
+            )
+            await result.consume()
+            current = version
+    return current
+
+
+async def missing_schema(driver: AsyncDriver) -> dict[str, list[str]]:
+    async with driver.session(**session_config()) as session:
+        result = await session.run("SHOW CONSTRAINTS YIELD name")
+        constraints = {r["name"] async for r in result}
+        result = await session.run("SHOW INDEXES YIELD name")
+        indexes = {r["name"] async for r in result}
+    return {
+        "constraints": sorted(EXPECTED_CONSTRAINTS - constraints),
+        "indexes": sorted(EXPECTED_INDEXES - indexes),
+    }
+
+
+async def bootstrap_schema() -> int:
+    driver = create_driver()
+    try:
+        return await apply_migrations(driver)
+    finally:
+        await driver.close()
+
+
+async def _check() -> int:
+    driver = create_driver()
+    try:
+        version = await get_schema_version(driver)
+        missing = await missing_schema(driver)
+    finally:
+        await driver.close()
+
+    print(f"Schema version: {version} (latest {SCHEMA_VERSION})")
+    for kind, names in missing.items():
+        for name in names:
+            print(f"Missing {kind[:-1]}: {name}")
+    if not any(missing.values()) and version == SCHEMA_VERSION:
+        print("Schema is up to date")
+        return 0
+    return 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Manage the Neo4j schema")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="report missing constraints and indexes without applying migrations",
+    )
+    args = parser.parse_args()
+
+    if args.check:
+        return asyncio.run(_check())
+
+    version = asyncio.run(bootstrap_schema())
+    print(f"Schema migrated to version {version}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
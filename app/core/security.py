@@ -1,18 +1,92 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from neo4j import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_db
-from app.repositories.user_repository import UserRepository
+from app.core.cache import LRUCache
+from app.repositories.user_repository import user_loader
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_queue: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self._limit = workers + max_queue
+        self._pending = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(pwd_context.verify, plain_password, hashed_password)
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._pending >= self._limit:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many concurrent password operations",
+                headers={"Retry-After": "1"},
+            )
+        # The slot is released when the job itself finishes, not when the
+        # caller stops waiting: a cancelled request (client disconnect) leaves
+        # its bcrypt job running in the pool. A job still queued is cancelled
+        # along with the caller and releases its slot right away.
+        loop = asyncio.get_running_loop()
+        job = self._executor.submit(func, *args)
+        self._pending += 1
+        job.add_done_callback(lambda _: self._release_threadsafe(loop))
+        return await asyncio.wrap_future(job)
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop):
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:  # loop already closed at shutdown
+            pass
+
+    def _release(self):
+        self._pending -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+
+class PrincipalCache:
+    # Per-process and never invalidated: users are only ever created, so an
+    # entry can only go stale if a user is changed or removed out of band,
+    # and AUTH_CACHE_TTL_SECONDS bounds how long that is noticed late.
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = LRUCache(maxsize, ttl)
+
+    def get(self, token: str) -> Optional[dict[str, Any]]:
+        return self._cache.get(token)
+
+    def set(self, token: str, user: dict[str, Any], expires_at: float):
+        self._cache.set(token, user, ttl=expires_at - time.time())
+
+
+principal_cache = PrincipalCache(
+    settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -22,6 +96,14 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (
@@ -39,16 +121,17 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> dict:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     payload = decode_access_token(token)
     if not payload:
         raise credentials_exception
@@ -57,9 +140,11 @@ async def get_current_user(
     if not isinstance(user_id, str):
         raise credentials_exception
 
-    repo = UserRepository(db)
-    user = await repo.get_user_by_id(user_id)
+    user = await user_loader.load(user_id)
     if not user:
         raise credentials_exception
 
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)):
+        principal_cache.set(token, user, expires_at)
     return user
@@ -0,0 +1,34 @@
+from typing import Any, Mapping
+import msgpack
+import orjson
+from fastapi import Request, Response
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+
+def accepts_msgpack(request: Request) -> bool:
+    accept = request.headers.get("accept", "")
+    return any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+
+def render(
+    request: Request,
+    content: Any,
+    status_code: int = 200,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    # Handlers return this directly, so FastAPI skips response_model validation
+    # and re-encoding; rows from the repository are already in response shape.
+    if accepts_msgpack(request):
+        body, media_type = msgpack.packb(content), MSGPACK_MEDIA_TYPE
+    else:
+        body, media_type = orjson.dumps(content), JSON_MEDIA_TYPE
+    response = Response(body, status_code=status_code, headers=headers, media_type=media_type)
+    response.headers["Vary"] = "Accept"
+    return response
+
+
+def ndjson_line(record: Any) -> bytes:
+    return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
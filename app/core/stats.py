@@ -0,0 +1,131 @@
+import logging
+from collections import Counter
+from typing import Any, Iterable
+from neo4j import AsyncDriver, READ_ACCESS
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from app.core.cache import redis_client
+from app.core.database import session_config
+
+logger = logging.getLogger(__name__)
+
+CARS_BY_MAKE_KEY = "stats:cars:make"
+CARS_BY_MODEL_KEY = "stats:cars:model"
+CARS_BY_YEAR_KEY = "stats:cars:year"
+SEEDED_KEY = "stats:cars:seeded"
+COUNTER_KEYS = (CARS_BY_MAKE_KEY, CARS_BY_MODEL_KEY, CARS_BY_YEAR_KEY)
+MODEL_FIELD_SEPARATOR = "\x1f"
+
+# ARGV holds (key index, field, delta) triples. Increment and drop-at-zero run
+# together, so a concurrent increment can never be deleted with the field.
+RECORD_SCRIPT = """
+for i = 1, #ARGV, 3 do
+    local key = KEYS[tonumber(ARGV[i])]
+    if redis.call('hincrby', key, ARGV[i + 1], ARGV[i + 2]) <= 0 then
+        redis.call('hdel', key, ARGV[i + 1])
+    end
+end
+return 0
+"""
+
+RECOMPUTE_QUERY = """
+MATCH (c:Car)-[:INSTANCE_OF]->(cm:CarModel)
+RETURN cm.make_name AS make_name, cm.name AS model_name, c.year AS year, count(*) AS cars
+"""
+
+
+def _model_field(make_name: str, model_name: str) -> str:
+    return f"{make_name}{MODEL_FIELD_SEPARATOR}{model_name}"
+
+
+def _tally(cars: Iterable[dict[str, Any]], weight: int, counters: dict[str, Counter]):
+    for car in cars:
+        make_name, model_name, year = car.get("make_name"), car.get("model_name"), car.get("year")
+        if make_name is None or model_name is None:
+            continue
+        counters[CARS_BY_MAKE_KEY][make_name] += weight
+        counters[CARS_BY_MODEL_KEY][_model_field(make_name, model_name)] += weight
+        if year is not None:
+            counters[CARS_BY_YEAR_KEY][str(year)] += weight
+
+
+class CatalogStats:
+    def __init__(self, client: Redis):
+        self.client = client
+
+    async def record(
+        self,
+        added: Iterable[dict[str, Any]] = (),
+        removed: Iterable[dict[str, Any]] = (),
+    ):
+        counters: dict[str, Counter] = {
+            CARS_BY_MAKE_KEY: Counter(),
+            CARS_BY_MODEL_KEY: Counter(),
+            CARS_BY_YEAR_KEY: Counter(),
+        }
+        _tally(added, 1, counters)
+        _tally(removed, -1, counters)
+
+        args: list[Any] = []
+        for index, key in enumerate(COUNTER_KEYS, start=1):
+            for field, delta in counters[key].items():
+                if delta:
+                    args.extend((index, field, delta))
+        if not args:
+            return
+
+        try:
+            await self.client.eval(RECORD_SCRIPT, len(COUNTER_KEYS), *COUNTER_KEYS, *args)
+        except RedisError as e:
+            logger.warning("Could not update catalog stats, recompute to repair: %s", e)
+
+    async def cars_by_make(self) -> dict[str, int]:
+        counts = await self.client.hgetall(CARS_BY_MAKE_KEY)
+        return {make: int(count) for make, count in sorted(counts.items())}
+
+    async def cars_by_year(self) -> dict[int, int]:
+        counts = await self.client.hgetall(CARS_BY_YEAR_KEY)
+        return {int(year): int(count) for year, count in sorted(counts.items())}
+
+    async def models_by_make(self) -> dict[str, int]:
+        counts = await self.client.hgetall(CARS_BY_MODEL_KEY)
+        models: Counter = Counter()
+        for field, count in counts.items():
+            if int(count) > 0:
+                models[field.split(MODEL_FIELD_SEPARATOR, 1)[0]] += 1
+        return dict(sorted(models.items()))
+
+    async def ensure_seeded(self, driver: AsyncDriver) -> bool:
+        # Counters only track changes, so a catalog that existed before them
+        # (or a Redis that lost them) needs one full recompute.
+        if await self.client.exists(SEEDED_KEY):
+            return False
+        await self.recompute(driver)
+        return True
+
+    async def recompute(self, driver: AsyncDriver) -> int:
+        counters: dict[str, Counter] = {
+            CARS_BY_MAKE_KEY: Counter(),
+            CARS_BY_MODEL_KEY: Counter(),
+            CARS_BY_YEAR_KEY: Counter(),
+        }
+        total = 0
+        async with driver.session(**session_config(READ_ACCESS)) as session:
+            result = await session.run(RECOMPUTE_QUERY)
+            async for record in result:
+                total += record["cars"]
+                _tally([record.data()], record["cars"], counters)
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            for key, counter in counters.items():
+                pipe.delete(key)
+                if counter:
+                    pipe.hset(key, mapping={field: count for field, count in counter.items()})
+            pipe.set(SEEDED_KEY, 1)
+            await pipe.execute()
+
+        logger.info("Catalog stats recomputed for %d cars", total)
+        return total
+
+
+catalog_stats = CatalogStats(redis_client)
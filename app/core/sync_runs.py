@@ -0,0 +1,158 @@
+import time
+from typing import Any
+from redis.asyncio import Redis
+from app.core.cache import redis_client
+from app.core.config import settings
+
+RUNS_KEY = "sync:runs"
+COUNT_FIELDS = ("fetched", "skipped", "inserted", "updated", "unchanged")
+NUMERIC_FIELDS = {
+    "started_at", "finished_at", "attempts", "shards", "pages", "deleted", *COUNT_FIELDS
+}
+
+
+def run_key(run_id: str, name: str | None = None) -> str:
+    return f"sync:run:{run_id}" if name is None else f"sync:run:{run_id}:{name}"
+
+
+def shard_key(run_id: str, index: int) -> str:
+    return run_key(run_id, f"shard:{index}")
+
+
+def _decode_value(key: str, value: str) -> Any:
+    if not value:
+        return None
+    if key in NUMERIC_FIELDS:
+        return float(value) if "." in value else int(value)
+    return value
+
+
+def _decode(fields: dict[str, str]) -> dict[str, Any]:
+    return {key: _decode_value(key, value) for key, value in fields.items()}
+
+
+class SyncRunStore:
+    # Run and shard checkpoints are plain Redis hashes. A shard's
+    # last_object_id only moves forward over pages that are fully written, so a
+    # retry can resume right after it without skipping anything.
+    def __init__(self, client: Redis):
+        self.client = client
+
+    async def create(self, run_id: str, shards: list[tuple[str | None, str | None]]):
+        ttl = settings.SYNC_RUN_TTL_SECONDS
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                run_key(run_id),
+                mapping={
+                    "run_id": run_id,
+                    "status": "running",
+                    "started_at": time.time(),
+                    "attempts": 1,
+                    "shards": len(shards),
+                },
+            )
+            pipe.expire(run_key(run_id), ttl)
+            for index, (lower, upper) in enumerate(shards):
+                pipe.hset(
+                    shard_key(run_id, index),
+                    mapping={
+                        "lower": lower or "",
+                        "upper": upper or "",
+                        "status": "pending",
+                        "last_object_id": "",
+                        "pages": 0,
+                        **{field: 0 for field in COUNT_FIELDS},
+                    },
+                )
+                pipe.expire(shard_key(run_id, index), ttl)
+            pipe.lpush(RUNS_KEY, run_id)
+            pipe.ltrim(RUNS_KEY, 0, settings.SYNC_HISTORY_SIZE - 1)
+            await pipe.execute()
+
+    async def resume(self, run_id: str) -> list[int]:
+        run = await self.get_run(run_id)
+        shards = run["shards"] if run else []
+        ttl = settings.SYNC_RUN_TTL_SECONDS
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(run_key(run_id), mapping={"status": "running", "error": ""})
+            pipe.hincrby(run_key(run_id), "attempts", 1)
+            for name in (None, "seen", "changed"):
+                pipe.expire(run_key(run_id, name), ttl)
+            for shard in shards:
+                pipe.expire(shard_key(run_id, shard["index"]), ttl)
+            await pipe.execute()
+        return [shard["index"] for shard in shards if shard["status"] != "done"]
+
+    async def resumable(self) -> str | None:
+        # The latest run is resumed if it failed, or if it is still marked
+        # running although nobody holds the sync lock (its worker died).
+        run_id = await self.client.lindex(RUNS_KEY, 0)
+        if run_id is None:
+            return None
+        status = await self.client.hget(run_key(run_id), "status")
+        return run_id if status in ("running", "failed") else None
+
+    async def shard(self, run_id: str, index: int) -> dict[str, Any]:
+        return _decode(await self.client.hgetall(shard_key(run_id, index)))
+
+    async def set_shard(self, run_id: str, index: int, **fields: Any):
+        await self.client.hset(shard_key(run_id, index), mapping=fields)
+
+    async def commit_pages(
+        self, run_id: str, index: int, last_object_id: str, pages: int, counts: dict[str, int]
+    ):
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(shard_key(run_id, index), "last_object_id", last_object_id)
+            pipe.hincrby(shard_key(run_id, index), "pages", pages)
+            for field, value in counts.items():
+                if value:
+                    pipe.hincrby(shard_key(run_id, index), field, value)
+            await pipe.execute()
+
+    async def totals(self, run_id: str) -> dict[str, int]:
+        run = await self.get_run(run_id)
+        return {
+            field: sum(shard.get(field, 0) for shard in run["shards"])
+            for field in COUNT_FIELDS
+        }
+
+    async def finish(self, run_id: str, **fields: Any):
+        await self.client.hset(
+            run_key(run_id),
+            mapping={"status": "finished", "finished_at": time.time(), **fields},
+        )
+
+    async def fail(self, run_id: str):
+        run = await self.get_run(run_id)
+        shards = run["shards"] if run else []
+        errors = [
+            f"shard {shard['index']}: {shard['error']}" for shard in shards if shard.get("error")
+        ]
+        await self.client.hset(
+            run_key(run_id),
+            mapping={"status": "failed", "finished_at": time.time(), "error": "; ".join(errors)},
+        )
+
+    async def get_run(self, run_id: str) -> dict[str, Any] | None:
+        run = _decode(await self.client.hgetall(run_key(run_id)))
+        if not run:
+            return None
+        async with self.client.pipeline(transaction=False) as pipe:
+            for index in range(run.get("shards", 0)):
+                pipe.hgetall(shard_key(run_id, index))
+            shards = await pipe.execute()
+        run["shards"] = [
+            {"index": index, **_decode(shard)} for index, shard in enumerate(shards)
+        ]
+        return run
+
+    async def history(self, limit: int = 20) -> list[dict[str, Any]]:
+        run_ids = await self.client.lrange(RUNS_KEY, 0, limit - 1)
+        async with self.client.pipeline(transaction=False) as pipe:
+            for run_id in run_ids:
+                pipe.hgetall(run_key(run_id))
+            runs = await pipe.execute()
+        return [_decode(run) for run in runs if run]
+
+
+sync_runs = SyncRunStore(redis_client)
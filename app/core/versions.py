@@ -0,0 +1,88 @@
+import logging
+import time
+import uuid
+from typing import Iterable, NamedTuple
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from app.core.cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = "catalog:version"
+CAR_VERSIONS_KEY = "catalog:version:cars"
+BUMP_CHUNK_SIZE = 1000
+
+
+class Version(NamedTuple):
+    epoch: str
+    version: int
+    modified: float | None
+
+    @property
+    def token(self) -> str:
+        return f"{self.epoch}-{self.version}"
+
+
+class CatalogVersions:
+    # A catalog-wide counter plus the counter value at which each car last
+    # changed. The epoch is regenerated whenever the counters are lost, so
+    # ETags handed out before a Redis flush can never match again.
+    def __init__(self, client: Redis):
+        self.client = client
+
+    async def bump(self, car_ids: Iterable[str] = ()) -> int | None:
+        car_ids = list(car_ids)
+        now = time.time()
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.hsetnx(CATALOG_VERSION_KEY, "epoch", uuid.uuid4().hex[:8])
+                pipe.hincrby(CATALOG_VERSION_KEY, "version", 1)
+                pipe.hset(CATALOG_VERSION_KEY, "modified", now)
+                _, version, _ = await pipe.execute()
+
+            stamp = f"{version}:{now}"
+            async with self.client.pipeline(transaction=False) as pipe:
+                for start in range(0, len(car_ids), BUMP_CHUNK_SIZE):
+                    chunk = car_ids[start:start + BUMP_CHUNK_SIZE]
+                    pipe.hset(CAR_VERSIONS_KEY, mapping={car_id: stamp for car_id in chunk})
+                await pipe.execute()
+            return version
+        except RedisError as e:
+            logger.warning("Could not bump catalog version: %s", e)
+            return None
+
+    async def catalog(self) -> Version | None:
+        try:
+            epoch, version, modified = await self.client.hmget(
+                CATALOG_VERSION_KEY, ["epoch", "version", "modified"]
+            )
+            if epoch is None:
+                await self.client.hsetnx(CATALOG_VERSION_KEY, "epoch", uuid.uuid4().hex[:8])
+                epoch = await self.client.hget(CATALOG_VERSION_KEY, "epoch")
+        except RedisError as e:
+            logger.warning("Could not read catalog version: %s", e)
+            return None
+        return Version(epoch, int(version or 0), float(modified) if modified else None)
+
+    async def cars(self, car_ids: list[str]) -> list[Version] | None:
+        catalog = await self.catalog()
+        if catalog is None:
+            return None
+        try:
+            stamps = await self.client.hmget(CAR_VERSIONS_KEY, car_ids) if car_ids else []
+        except RedisError as e:
+            logger.warning("Could not read car versions: %s", e)
+            return None
+
+        versions = []
+        for stamp in stamps:
+            if stamp is None:
+                # Unchanged since versioning started.
+                versions.append(Version(catalog.epoch, 0, None))
+            else:
+                version, modified = stamp.split(":", 1)
+                versions.append(Version(catalog.epoch, int(version), float(modified)))
+        return versions
+
+
+catalog_versions = CatalogVersions(redis_client)
@@ -1,180 +1,462 @@
-from neo4j import AsyncSession
-from typing import TYPE_CHECKING
+import logging
+import time
+from neo4j import AsyncSession, AsyncManagedTransaction, READ_ACCESS
+from app.core.database import driver, session_config
+from app.core.metrics import track_query
+from app.repositories.loader import BatchLoader
+from typing import TYPE_CHECKING, Any, AsyncIterator
 
 if TYPE_CHECKING:
-    from app.api.cars.car_schema import CarUpdate, CarCreate
+    from app.api.cars.car_schema import CarUpdate, CarCreate, CarFilters
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+UPSERT_MAKES_QUERY = """
+UNWIND $rows AS row
+MERGE (m:Make {name: row.name})
+"""
+
+UPSERT_MODELS_QUERY = """
+UNWIND $rows AS row
+MATCH (m:Make {name: row.make_name})
+MERGE (cm:CarModel {make_name: row.make_name, name: row.name})
+MERGE (cm)-[:BELONGS_TO]->(m)
+"""
+
+UPSERT_CARS_QUERY = """
+UNWIND $rows AS row
+MATCH (cm:CarModel {make_name: row.make_name, name: row.model_name})
+MERGE (c:Car {id: row.id})
+SET c.year = row.year, c.source = row.source, c.source_hash = row.hash
+WITH c, cm
+OPTIONAL MATCH (c)-[old:INSTANCE_OF]->(prev:CarModel)
+WHERE prev <> cm
+DELETE old
+MERGE (c)-[:INSTANCE_OF]->(cm)
+"""
+
+SYNC_STATE_QUERY = """
+UNWIND $ids AS id
+MATCH (c:Car {id: id})
+OPTIONAL MATCH (c)-[:INSTANCE_OF]->(cm:CarModel)
+RETURN c.id AS id, c.source_hash AS hash, c.year AS year,
+       cm.make_name AS make_name, cm.name AS model_name
+"""
+
+SOURCE_CAR_IDS_QUERY = """
+MATCH (c:Car)
+USING INDEX c:Car(id)
+WHERE c.id > $after AND c.source = $source
+RETURN c.id AS id
+ORDER BY c.id
+LIMIT $limit
+"""
+
+DELETE_CARS_QUERY = """
+UNWIND $rows AS id
+CALL {
+    WITH id
+    MATCH (c:Car {id: id})
+    OPTIONAL MATCH (c)-[:INSTANCE_OF]->(cm:CarModel)
+    WITH c, c.year AS year, cm.make_name AS make_name, cm.name AS model_name
+    DETACH DELETE c
+    RETURN year, make_name, model_name
+} IN TRANSACTIONS OF $batch_size ROWS
+RETURN id, year, make_name, model_name
+"""
+
+DELETE_ORPHAN_MODELS_QUERY = """
+MATCH (cm:CarModel)
+WHERE NOT (cm)<-[:INSTANCE_OF]-(:Car)
+CALL {
+    WITH cm
+    WITH cm WHERE NOT (cm)<-[:INSTANCE_OF]-()
+    OPTIONAL MATCH (cm)-[b:BELONGS_TO]->()
+    DELETE b, cm
+} IN TRANSACTIONS OF $batch_size ROWS
+"""
+
+DELETE_ORPHAN_MAKES_QUERY = """
+MATCH (m:Make)
+WHERE NOT (m)<-[:BELONGS_TO]-(:CarModel)
+CALL {
+    WITH m
+    WITH m WHERE NOT (m)<-[:BELONGS_TO]-()
+    DELETE m
+} IN TRANSACTIONS OF $batch_size ROWS
+"""
+
+CREATE_CAR_QUERY = """
+MERGE (m:Make {name: $make_name})
+MERGE (cm:CarModel {make_name: $make_name, name: $model_name})
+MERGE (cm)-[:BELONGS_TO]->(m)
+CREATE (c:Car {id: $car_id, year: $year})-[:INSTANCE_OF]->(cm)
+RETURN c.id AS id, c.year AS year, m.name AS make, cm.name AS model
+"""
+
+GET_CAR_QUERY = """
+MATCH (c:Car {id: $car_id})-[:INSTANCE_OF]->(cm:CarModel)-[:BELONGS_TO]->(m:Make)
+RETURN c.id AS id, c.year AS year, m.name AS make, cm.name AS model
+"""
+
+GET_CARS_QUERY = """
+UNWIND $car_ids AS car_id
+MATCH (c:Car {id: car_id})-[:INSTANCE_OF]->(cm:CarModel)-[:BELONGS_TO]->(m:Make)
+RETURN c.id AS id, c.year AS year, m.name AS make, cm.name AS model
+"""
+
+EXPORT_CARS_QUERY = """
+MATCH (c:Car)-[:INSTANCE_OF]->(cm:CarModel)-[:BELONGS_TO]->(m:Make)
+RETURN c.id AS id, c.year AS year, m.name AS make, cm.name AS model
+"""
+
+UPDATE_CAR_QUERY = """
+MATCH (c:Car {id: $car_id})-[r:INSTANCE_OF]->(cm:CarModel)-[:BELONGS_TO]->(m:Make)
+WITH c, r, cm,
+     coalesce($make_name, m.name) AS make_name,
+     coalesce($model_name, cm.name) AS model_name,
+     {year: c.year, make_name: m.name, model_name: cm.name} AS previous
+SET c.year = coalesce($year, c.year)
+MERGE (new_make:Make {name: make_name})
+MERGE (new_model:CarModel {make_name: make_name, name: model_name})
+MERGE (new_model)-[:BELONGS_TO]->(new_make)
+FOREACH (_ IN CASE WHEN new_model <> cm THEN [1] ELSE [] END |
+    DELETE r
+    CREATE (c)-[:INSTANCE_OF]->(new_model)
+)
+RETURN c.id AS id, c.year AS year, new_make.name AS make, new_model.name AS model, previous
+"""
+
+DELETE_CAR_QUERY = """
+MATCH (c:Car {id: $car_id})
+OPTIONAL MATCH (c)-[:INSTANCE_OF]->(cm:CarModel)
+WITH c, c.year AS year, cm.make_name AS make_name, cm.name AS model_name
+DETACH DELETE c
+RETURN $car_id AS car_id, year, make_name, model_name
+"""
+
+
+def _car_from_record(record: dict[str, Any] | None) -> dict[str, Any] | None:
+    if not record:
+        return None
+    car = {
+        "id": record["id"],
+        "year": record["year"],
+        "make": record["make"],
+        "model": record["model"],
+    }
+    if record.get("previous") is not None:
+        car["previous"] = dict(record["previous"])
+    return car
+
+
+async def _fetch_one(
+    tx: AsyncManagedTransaction, name: str, query: str, params: dict[str, Any]
+) -> dict[str, Any] | None:
+    async with track_query(name, query, params) as tracker:
+        result = await tx.run(query, params)  # type: ignore[arg-type]
+        record = await result.single()
+        tracker.rows = 1 if record else 0
+        tracker.summary = await result.consume()
+    return record.data() if record else None
+
+
+async def _fetch_all(
+    tx: AsyncManagedTransaction, name: str, query: str, params: dict[str, Any]
+) -> list[dict[str, Any]]:
+    async with track_query(name, query, params) as tracker:
+        result = await tx.run(query, params)  # type: ignore[arg-type]
+        records = await result.data()
+        tracker.rows = len(records)
+        tracker.summary = await result.consume()
+    return records
+
+
+async def _run_batch(
+    tx: AsyncManagedTransaction, name: str, query: str, rows: list[Any]
+) -> list[dict[str, Any]]:
+    return await _fetch_all(tx, name, query, {"rows": rows})
+
+
+async def _run_batches(
+    tx: AsyncManagedTransaction, statements: list[tuple[str, str, list[Any]]]
+):
+    for name, query, rows in statements:
+        if rows:
+            await _run_batch(tx, name, query, rows)
 
 
 class CarRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def create_make(self, name: str):
-        query = """
-        MERGE (m:Make {name: $name})
-        RETURN m {.*} AS make
-        """
-        result = await self.session.run(query, name=name)  # type: ignore[arg-type]
-        record = await result.single()
-        return dict(record["make"]) if record else None
-
-    async def create_model(self, model_name: str, make_name: str):
-        query = """
-        MATCH (m:Make {name: $make_name})
-        MERGE (cm:CarModel {name: $model_name})
-        MERGE (cm)-[:BELONGS_TO]->(m)
-        RETURN cm {.*} AS model, m {.*} AS make
-        """
-        result = await self.session.run(  # type: ignore[arg-type]
-            query, model_name=model_name, make_name=make_name
-        )
-        record = await result.single()
-        if record:
-            return {"model": dict(record["model"]), "make": dict(record["make"])}
-        return None
-
     async def create_car(self, car_id: str, year: int, model_name: str, make_name: str):
-        query = """
-        MATCH (cm:CarModel {name: $model_name})-[:BELONGS_TO]->(m:Make {name: $make_name})
-        CREATE (c:Car {id: $car_id, year: $year})
-        MERGE (c)-[:INSTANCE_OF]->(cm)
-        RETURN c {.*} AS car, cm {.*} AS model, m {.*} AS make
-        """
-        result = await self.session.run(  # type: ignore[arg-type]
-            query,
-            car_id=car_id,
-            year=year,
-            model_name=model_name,
-            make_name=make_name,
+        params = {
+            "car_id": car_id,
+            "year": year,
+            "model_name": model_name,
+            "make_name": make_name,
+        }
+        record = await self.session.execute_write(
+            _fetch_one, "create_car", CREATE_CAR_QUERY, params
         )
-        record = await result.single()
-        if record:
-            return {
-                "car": dict(record["car"]),
-                "model": dict(record["model"]),
-                "make": dict(record["make"]),
-            }
-        return None
+        return _car_from_record(record)
 
     async def get_car(self, car_id: str):
-        query = """
-        MATCH (c:Car {id: $car_id})-[:INSTANCE_OF]->(cm:CarModel)-[:BELONGS_TO]->(m:Make)
-        RETURN c {.*} AS car, cm {.*} AS model, m {.*} AS make
-        """
-        result = await self.session.run(query, car_id=car_id)  # type: ignore[arg-type]
-        record = await result.single()
-        if record:
-            return {
-                "car": dict(record["car"]),
-                "model": dict(record["model"]),
-                "make": dict(record["make"]),
-            }
-        return None
+        record = await self.session.execute_read(
+            _fetch_one, "get_car", GET_CAR_QUERY, {"car_id": car_id}
+        )
+        return _car_from_record(record)
 
-    async def list_cars(self, limit: int = 10):
-        query = """
-        MATCH (c:Car)-[:INSTANCE_OF]->(cm:CarModel)-[:BELONGS_TO]->(m:Make)
-        RETURN c {.*} AS car, cm {.*} AS model, m {.*} AS make
-        LIMIT $limit
-        """
-        result = await self.session.run(query, limit=limit)  # type: ignore[arg-type]
-        records = [r async for r in result]
-        return [
-            {
-                "car": dict(r["car"]),
-                "model": dict(r["model"]),
-                "make": dict(r["make"]),
-            }
-            for r in records
-        ]
+    async def get_cars(self, car_ids: list[str]) -> dict[str, dict[str, Any]]:
+        records = await self.session.execute_read(
+            _fetch_all, "get_cars", GET_CARS_QUERY, {"car_ids": car_ids}
+        )
+        return {record["id"]: record for record in records}
 
-    async def update_car(self, car_id: str, update_data: "CarUpdate"):
-        update_dict = update_data.model_dump(exclude_unset=True)
-        if not update_dict:
-            return await self.get_car(car_id)
-
-        query_parts = ["MATCH (c:Car {id: $car_id})"]
-        params = {"car_id": car_id}
-
-        if "year" in update_dict:
-            query_parts.append("SET c.year = $year")
-            params["year"] = update_dict["year"]
-
-        if "model_name" in update_dict or "make_name" in update_dict:
-            current_car_data = await self.get_car(car_id)
-            if not current_car_data:
-                return None
-            new_model_name = update_dict.get(
-                "model_name", current_car_data["model"]["name"]
-            )
-            new_make_name = update_dict.get(
-                "make_name", current_car_data["make"]["name"]
-            )
-            params["new_model_name"] = new_model_name
-            params["new_make_name"] = new_make_name
-            query_parts.extend(
-                [
-                    "WITH c",
-                    "MATCH (c)-[r:INSTANCE_OF]->()",
-                    "DELETE r",
-                    "WITH c",
-                    "MATCH (new_model:CarModel {name: $new_model_name})"
-                    "-[:BELONGS_TO]->(new_make:Make {name: $new_make_name})",
-                    "MERGE (c)-[:INSTANCE_OF]->(new_model)",
-                ]
-            )
+    async def list_cars(
+        self,
+        limit: int = 10,
+        after: str | None = None,
+        filters: "CarFilters | None" = None,
+    ):
+        query, params = self._list_cars_query(after, filters)
+        query += "\nLIMIT $limit"
+        params["limit"] = limit
+        # Rows are projected in the response shape, so they are returned as-is.
+        return await self.session.execute_read(_fetch_all, "list_cars", query, params)
+
+    async def stream_cars(
+        self,
+        after: str | None = None,
+        filters: "CarFilters | None" = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        query, params = self._list_cars_query(after, filters)
+        if limit is not None:
+            query += "\nLIMIT $limit"
+            params["limit"] = limit
+        async with track_query("stream_cars", query, params, streaming=True) as tracker:
+            result = await self.session.run(query, params)  # type: ignore[arg-type]
+            async for record in result:
+                tracker.stream_row()
+                yield record.data()
+            tracker.summary = await result.consume()
+
+    async def export_cars(self) -> AsyncIterator[dict[str, Any]]:
+        # Unordered on purpose: ORDER BY would make Neo4j sort the whole catalog
+        # before the first row. Rows arrive in fetch_size batches as consumed.
+        async with track_query("export_cars", EXPORT_CARS_QUERY, {}, streaming=True) as tracker:
+            result = await self.session.run(EXPORT_CARS_QUERY)
+            async for record in result:
+                tracker.stream_row()
+                yield record.data()
+            tracker.summary = await result.consume()
+
+    @staticmethod
+    def _list_cars_query(
+        after: str | None, filters: "CarFilters | None"
+    ) -> tuple[str, dict[str, Any]]:
+        conditions = []
+        params: dict[str, Any] = {}
 
-        query_parts.append(
-            "WITH c "
-            "MATCH (c)-[:INSTANCE_OF]->(cm:CarModel)-[:BELONGS_TO]->(m:Make) "
-            "RETURN c {.*} AS car, cm {.*} AS model, m {.*} AS make"
+        if after is not None:
+            conditions.append("c.id > $after")
+            params["after"] = after
+        if filters is not None:
+            if filters.make is not None:
+                conditions.append("m.name = $make")
+                params["make"] = filters.make
+            if filters.model is not None:
+                conditions.append("cm.name = $model")
+                params["model"] = filters.model
+            if filters.year_min is not None:
+                conditions.append("c.year >= $year_min")
+                params["year_min"] = filters.year_min
+            if filters.year_max is not None:
+                conditions.append("c.year <= $year_max")
+                params["year_max"] = filters.year_max
+
+        query_parts = ["MATCH (c:Car)-[:INSTANCE_OF]->(cm:CarModel)-[:BELONGS_TO]->(m:Make)"]
+        if conditions:
+            query_parts.append("WHERE " + " AND ".join(conditions))
+        query_parts.extend(
+            [
+                "RETURN c.id AS id, c.year AS year, m.name AS make, cm.name AS model",
+                "ORDER BY c.id",
+            ]
         )
-        query = "\n".join(query_parts)
+        return "\n".join(query_parts), params
 
-        result = await self.session.run(query, params)  # type: ignore[arg-type]
-        record = await result.single()
-        if record:
-            return {
-                "car": dict(record["car"]),
-                "model": dict(record["model"]),
-                "make": dict(record["make"]),
-            }
-        return None
+    async def update_car(self, car_id: str, update_data: "CarUpdate"):
+        update_dict = update_data.model_dump(exclude_unset=True)
+        params = {
+            "car_id": car_id,
+            "year": update_dict.get("year"),
+            "model_name": update_dict.get("model_name"),
+            "make_name": update_dict.get("make_name"),
+        }
+        record = await self.session.execute_write(
+            _fetch_one, "update_car", UPDATE_CAR_QUERY, params
+        )
+        return _car_from_record(record)
 
     async def replace_car(self, car_id: str, car_data: "CarCreate"):
-        query = """
-        MATCH (c:Car {id: $car_id})
-        OPTIONAL MATCH (c)-[r:INSTANCE_OF]->()
-        DELETE r
-        WITH c
-        SET c.year = $year
-        WITH c
-        MATCH (new_model:CarModel {name: $model_name})-[:BELONGS_TO]->(new_make:Make {name: $make_name})
-        MERGE (c)-[:INSTANCE_OF]->(new_model)
-        RETURN c {.*} AS car, new_model {.*} AS model, new_make {.*} AS make
-        """
         params = {
             "car_id": car_id,
             "year": car_data.year,
             "model_name": car_data.model_name,
             "make_name": car_data.make_name,
         }
-        result = await self.session.run(query, params)  # type: ignore[arg-type]
-        record = await result.single()
-        if record:
-            return {
-                "car": dict(record["car"]),
-                "model": dict(record["model"]),
-                "make": dict(record["make"]),
-            }
-        return None
+        record = await self.session.execute_write(
+            _fetch_one, "replace_car", UPDATE_CAR_QUERY, params
+        )
+        return _car_from_record(record)
 
     async def delete_car(self, car_id: str):
-        query = """
-        MATCH (c:Car {id: $car_id})
-        DETACH DELETE c
-        RETURN $car_id AS car_id
-        """
-        result = await self.session.run(query, car_id=car_id)  # type: ignore[arg-type]
-        record = await result.single()
-        return {"deleted": True, "car_id": record["car_id"]} if record else None
+        record = await self.session.execute_write(
+            _fetch_one, "delete_car", DELETE_CAR_QUERY, {"car_id": car_id}
+        )
+        return {"deleted": True, **record} if record else None
+
+    async def bulk_upsert(
+        self,
+        makes: list[dict[str, Any]],
+        models: list[dict[str, Any]],
+        cars: list[dict[str, Any]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> dict[str, int]:
+        return {
+            "makes": await self._write_batches(
+                "upsert_makes", UPSERT_MAKES_QUERY, makes, batch_size
+            ),
+            "models": await self._write_batches(
+                "upsert_models", UPSERT_MODELS_QUERY, models, batch_size
+            ),
+            "cars": await self._write_batches("upsert_cars", UPSERT_CARS_QUERY, cars, batch_size),
+        }
+
+    async def create_cars_bulk(self, cars: list[dict[str, Any]]) -> int:
+        makes = {car["make_name"]: {"name": car["make_name"]} for car in cars}
+        models = {
+            (car["make_name"], car["model_name"]): {
+                "name": car["model_name"],
+                "make_name": car["make_name"],
+            }
+            for car in cars
+        }
+        await self.session.execute_write(
+            _run_batches,
+            [
+                ("upsert_makes", UPSERT_MAKES_QUERY, list(makes.values())),
+                ("upsert_models", UPSERT_MODELS_QUERY, list(models.values())),
+                ("upsert_cars", UPSERT_CARS_QUERY, cars),
+            ],
+        )
+        return len(cars)
+
+    async def get_sync_state(self, car_ids: list[str]) -> dict[str, dict[str, Any]]:
+        records = await self.session.execute_read(
+            _fetch_all, "get_sync_state", SYNC_STATE_QUERY, {"ids": car_ids}
+        )
+        return {record["id"]: record for record in records}
+
+    async def iter_source_car_ids(
+        self, source: str, page_size: int = DEFAULT_BATCH_SIZE
+    ) -> AsyncIterator[list[str]]:
+        # Keyset pages over the unique id index, so memory stays flat however
+        # large the catalog is.
+        after = ""
+        while True:
+            records = await self.session.execute_read(
+                _fetch_all,
+                "source_car_ids",
+                SOURCE_CAR_IDS_QUERY,
+                {"source": source, "after": after, "limit": page_size},
+            )
+            car_ids = [record["id"] for record in records]
+            if car_ids:
+                yield car_ids
+            if len(car_ids) < page_size:
+                return
+            after = car_ids[-1]
+
+    async def delete_cars(
+        self, car_ids: list[str], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> list[dict[str, Any]]:
+        # One round trip; Neo4j commits every batch_size rows on its own, so a
+        # large purge never becomes one huge transaction.
+        params = {"rows": car_ids, "batch_size": batch_size}
+        deleted, _ = await self._run_in_transactions("delete_cars", DELETE_CARS_QUERY, params)
+        return deleted
+
+    async def delete_orphan_models(self, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        _, summary = await self._run_in_transactions(
+            "delete_orphan_models", DELETE_ORPHAN_MODELS_QUERY, {"batch_size": batch_size}
+        )
+        return summary.counters.nodes_deleted
+
+    async def delete_orphan_makes(self, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        _, summary = await self._run_in_transactions(
+            "delete_orphan_makes", DELETE_ORPHAN_MAKES_QUERY, {"batch_size": batch_size}
+        )
+        return summary.counters.nodes_deleted
+
+    async def _run_in_transactions(
+        self, name: str, query: str, params: dict[str, Any]
+    ) -> tuple[list[dict[str, Any]], Any]:
+        # CALL { } IN TRANSACTIONS only runs in an auto-commit transaction,
+        # so these go through session.run rather than execute_write.
+        started = time.perf_counter()
+        async with track_query(name, query, params) as tracker:
+            result = await self.session.run(query, params)  # type: ignore[arg-type]
+            records = await result.data()
+            tracker.rows = len(records)
+            tracker.summary = await result.consume()
+        logger.info(
+            "%s deleted %d nodes in %.3fs",
+            name,
+            tracker.summary.counters.nodes_deleted,
+            time.perf_counter() - started,
+        )
+        return records, tracker.summary
+
+    async def _write_batches(
+        self,
+        name: str,
+        query: str,
+        rows: list[Any],
+        batch_size: int,
+    ) -> int:
+        written = 0
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            started = time.perf_counter()
+            await self.session.execute_write(_run_batch, name, query, batch)
+            elapsed = time.perf_counter() - started
+            written += len(batch)
+            logger.info(
+                "%s wrote %d rows in %.3fs (%.0f rows/s)",
+                name,
+                len(batch),
+                elapsed,
+                len(batch) / elapsed if elapsed > 0 else float("inf"),
+            )
+        return written
+
+
+# (car_id, version token). Keying loads by version means a read that saw a
+# newer version never shares a load issued before the write that bumped it.
+CarKey = tuple[str, str | None]
+
+
+async def _load_cars(keys: list[CarKey]) -> dict[CarKey, dict[str, Any]]:
+    car_ids = list(dict.fromkeys(car_id for car_id, _ in keys))
+    async with driver.session(**session_config(READ_ACCESS)) as session:
+        cars = await CarRepository(session).get_cars(car_ids)
+    return {key: cars[key[0]] for key in keys if key[0] in cars}
+
+
+car_loader: BatchLoader[CarKey, dict[str, Any]] = BatchLoader(_load_cars)
@@ -0,0 +1,161 @@
+import logging
+import re
+from bisect import bisect_left
+from typing import Any
+from neo4j import AsyncDriver, AsyncSession, READ_ACCESS
+from app.core.database import session_config
+from app.core.events import CatalogRefresher
+
+logger = logging.getLogger(__name__)
+
+NAMES_QUERY = """
+MATCH (m:Make)
+OPTIONAL MATCH (m)<-[:BELONGS_TO]-(cm:CarModel)
+RETURN m.name AS make, collect(cm.name) AS models
+"""
+
+FULLTEXT_QUERY = """
+CALL db.index.fulltext.queryNodes('catalog_names', $query) YIELD node, score
+RETURN 'Make' IN labels(node) AS is_make, node.name AS name, node.make_name AS make_name
+ORDER BY score DESC
+LIMIT $limit
+"""
+
+LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _next_row(row: list[int], query: str, char: str) -> list[int]:
+    next_row = [row[0] + 1]
+    for j, query_char in enumerate(query, 1):
+        next_row.append(min(row[j] + 1, next_row[j - 1] + 1, row[j - 1] + (query_char != char)))
+    return next_row
+
+
+class NameIndex:
+    __slots__ = ("keys", "entries")
+
+    def __init__(self, names: list[tuple[str, list[str]]]):
+        pairs: list[tuple[str, tuple[str, str | None]]] = []
+        for make, models in names:
+            pairs.append((_normalize(make), (make, None)))
+            for model in models:
+                pairs.append((_normalize(model), (make, model)))
+                pairs.append((_normalize(f"{make} {model}"), (make, model)))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.entries = [entry for _, entry in pairs]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def search(self, query: str, limit: int = 10, fuzzy: bool = True) -> list[dict[str, Any]]:
+        query = _normalize(query)
+        if not query:
+            return []
+
+        results: dict[tuple[str, str | None], str] = {}
+        start = bisect_left(self.keys, query)
+        self._collect(start, len(self.keys), query, "prefix", results, limit)
+
+        if fuzzy and len(results) < limit and len(query) >= 3:
+            # Typos in the first character are rare in typeahead input, so the
+            # fuzzy walk only explores keys that share it with the query.
+            max_distance = 1 if len(query) <= 7 else 2
+            first_row = _next_row(list(range(len(query) + 1)), query, query[0])
+            low = bisect_left(self.keys, query[0])
+            high = bisect_left(self.keys, chr(ord(query[0]) + 1), low)
+            matches: list[tuple[int, int, int]] = []
+            self._walk(low, high, 1, first_row, query, max_distance, matches)
+            for _, low, high in sorted(matches):
+                self._collect(low, high, None, "fuzzy", results, limit)
+                if len(results) >= limit:
+                    break
+
+        return [
+            {"type": "make" if model is None else "model", "make": make, "model": model, "match": match}
+            for (make, model), match in results.items()
+        ]
+
+    def _collect(
+        self,
+        low: int,
+        high: int,
+        prefix: str | None,
+        match: str,
+        results: dict[tuple[str, str | None], str],
+        limit: int,
+    ):
+        for position in range(low, high):
+            if len(results) >= limit:
+                return
+            if prefix is not None and not self.keys[position].startswith(prefix):
+                return
+            results.setdefault(self.entries[position], match)
+
+    def _walk(
+        self,
+        low: int,
+        high: int,
+        depth: int,
+        row: list[int],
+        query: str,
+        max_distance: int,
+        matches: list[tuple[int, int, int]],
+    ):
+        # The sorted keys form an implicit trie: every key in [low, high) shares
+        # the same first `depth` characters, and each child is a contiguous range.
+        position = low
+        while position < high and len(self.keys[position]) == depth:
+            position += 1
+
+        while position < high:
+            key = self.keys[position]
+            char = key[depth]
+            child_high = bisect_left(self.keys, key[:depth] + chr(ord(char) + 1), position, high)
+
+            child_row = _next_row(row, query, char)
+
+            if child_row[-1] <= max_distance:
+                matches.append((child_row[-1], position, child_high))
+            elif min(child_row) <= max_distance:
+                self._walk(
+                    position, child_high, depth + 1, child_row, query, max_distance, matches
+                )
+            position = child_high
+
+
+class CatalogSearchStore(CatalogRefresher):
+    def __init__(self):
+        super().__init__()
+        self.index: NameIndex | None = None
+
+    async def rebuild(self, driver: AsyncDriver):
+        async with driver.session(**session_config(READ_ACCESS)) as session:
+            result = await session.run(NAMES_QUERY)
+            names = [(record["make"], record["models"]) async for record in result]
+        self.index = NameIndex(names)
+        logger.info("Catalog search index rebuilt with %d keys", len(self.index))
+
+
+async def search_fulltext(session: AsyncSession, query: str, limit: int) -> list[dict[str, Any]]:
+    escaped = LUCENE_SPECIAL.sub(r"\\\1", _normalize(query))
+    if not escaped:
+        return []
+    lucene = " AND ".join(f"({term}* OR {term}~)" for term in escaped.split())
+    result = await session.run(FULLTEXT_QUERY, query=lucene, limit=limit)  # type: ignore[arg-type]
+    return [
+        {
+            "type": "make" if record["is_make"] else "model",
+            "make": record["name"] if record["is_make"] else record["make_name"],
+            "model": None if record["is_make"] else record["name"],
+            "match": "fulltext",
+        }
+        async for record in result
+    ]
+
+
+catalog_search = CatalogSearchStore()
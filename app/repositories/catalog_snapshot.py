@@ -0,0 +1,158 @@
+import heapq
+import logging
+import sys
+from array import array
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+from neo4j import AsyncDriver, READ_ACCESS
+from app.core.database import session_config
+from app.core.events import CatalogRefresher
+from app.core.versions import Version, catalog_versions
+
+if TYPE_CHECKING:
+    from app.api.cars.car_schema import CarFilters
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_QUERY = """
+MATCH (c:Car)-[:INSTANCE_OF]->(cm:CarModel)-[:BELONGS_TO]->(m:Make)
+RETURN c.id AS id, c.year AS year, m.name AS make, cm.name AS model
+ORDER BY c.id
+"""
+
+
+class CatalogSnapshot:
+    __slots__ = (
+        "ids",
+        "years",
+        "model_refs",
+        "model_names",
+        "model_makes",
+        "make_names",
+        "by_make",
+        "by_year",
+        "version",
+    )
+
+    def __init__(
+        self,
+        rows: Iterable[tuple[str, int | None, str, str]],
+        version: Version | None = None,
+    ):
+        # The catalog version read before the rows were queried; the snapshot
+        # holds at least every change up to it.
+        self.version = version
+        self.ids: list[str] = []
+        self.years = array("H")
+        self.model_refs = array("I")
+        self.model_names: list[str] = []
+        self.model_makes = array("I")
+        self.make_names: list[str] = []
+        self.by_make: dict[str, array] = {}
+        self.by_year: dict[int, array] = {}
+
+        make_refs: dict[str, int] = {}
+        model_refs: dict[tuple[str, str], int] = {}
+        for position, (car_id, year, make, model) in enumerate(rows):
+            make_ref = make_refs.get(make)
+            if make_ref is None:
+                make_ref = make_refs[make] = len(self.make_names)
+                self.make_names.append(sys.intern(make))
+                self.by_make[self.make_names[make_ref]] = array("I")
+
+            model_ref = model_refs.get((make, model))
+            if model_ref is None:
+                model_ref = model_refs[(make, model)] = len(self.model_names)
+                self.model_names.append(sys.intern(model))
+                self.model_makes.append(make_ref)
+
+            self.ids.append(car_id)
+            self.years.append(year or 0)
+            self.model_refs.append(model_ref)
+            self.by_make[self.make_names[make_ref]].append(position)
+            self.by_year.setdefault(year or 0, array("I")).append(position)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def get_car(self, car_id: str) -> dict[str, Any] | None:
+        position = bisect_right(self.ids, car_id) - 1
+        if position < 0 or self.ids[position] != car_id:
+            return None
+        return self._row(position)
+
+    def list_cars(
+        self,
+        limit: int = 10,
+        after: str | None = None,
+        filters: "CarFilters | None" = None,
+    ) -> list[dict[str, Any]]:
+        cars = []
+        for position in self._candidates(after, filters):
+            if filters is not None and not self._matches(position, filters):
+                continue
+            cars.append(self._row(position))
+            if len(cars) >= limit:
+                break
+        return cars
+
+    def _candidates(
+        self, after: str | None, filters: "CarFilters | None"
+    ) -> Iterator[int]:
+        if filters is not None and filters.make is not None:
+            positions: Iterable[int] = self.by_make.get(filters.make, ())
+        elif filters is not None and (filters.year_min is not None or filters.year_max is not None):
+            low = filters.year_min if filters.year_min is not None else 0
+            high = filters.year_max if filters.year_max is not None else 65535
+            positions = heapq.merge(
+                *(rows for year, rows in self.by_year.items() if low <= year <= high)
+            )
+        else:
+            start = bisect_right(self.ids, after) if after is not None else 0
+            return iter(range(start, len(self.ids)))
+
+        if after is None:
+            return iter(positions)
+        return (position for position in positions if self.ids[position] > after)
+
+    def _matches(self, position: int, filters: "CarFilters") -> bool:
+        model_ref = self.model_refs[position]
+        if filters.make is not None and self.make_names[self.model_makes[model_ref]] != filters.make:
+            return False
+        if filters.model is not None and self.model_names[model_ref] != filters.model:
+            return False
+        year = self.years[position]
+        if filters.year_min is not None and year < filters.year_min:
+            return False
+        if filters.year_max is not None and year > filters.year_max:
+            return False
+        return True
+
+    def _row(self, position: int) -> dict[str, Any]:
+        model_ref = self.model_refs[position]
+        return {
+            "id": self.ids[position],
+            "year": self.years[position],
+            "make": self.make_names[self.model_makes[model_ref]],
+            "model": self.model_names[model_ref],
+        }
+
+
+class CatalogSnapshotStore(CatalogRefresher):
+    def __init__(self):
+        super().__init__()
+        self.snapshot: CatalogSnapshot | None = None
+
+    async def rebuild(self, driver: AsyncDriver):
+        version = await catalog_versions.catalog()
+        async with driver.session(**session_config(READ_ACCESS)) as session:
+            result = await session.run(SNAPSHOT_QUERY)
+            rows = [
+                (record["id"], record["year"], record["make"], record["model"])
+                async for record in result
+            ]
+        self.snapshot = CatalogSnapshot(rows, version)
+        logger.info("Catalog snapshot rebuilt with %d cars", len(self.snapshot))
+
+
+catalog_snapshot = CatalogSnapshotStore()
@@ -0,0 +1,75 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, Iterable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    # Every load() made during one event-loop tick is collected and resolved by
+    # a single load_many() call on the next tick. A key that is already queued
+    # or in flight shares the pending future instead of being fetched again.
+    def __init__(
+        self,
+        load_many: Callable[[list[K]], Awaitable[dict[K, V]]],
+        max_batch_size: int = 500,
+    ):
+        self.load_many = load_many
+        self.max_batch_size = max_batch_size
+        self._queue: dict[K, asyncio.Future] = {}
+        self._in_flight: dict[K, asyncio.Future] = {}
+        self._scheduled = False
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V | None:
+        future = self._in_flight.get(key) or self._queue.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._queue[key] = loop.create_future()
+            future.add_done_callback(_consume_exception)
+            if not self._scheduled:
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    async def load_all(self, keys: Iterable[K]) -> dict[K, V]:
+        keys = list(dict.fromkeys(keys))
+        values = await asyncio.gather(*(self.load(key) for key in keys))
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def _dispatch(self):
+        self._scheduled = False
+        queue, self._queue = self._queue, {}
+        self._in_flight.update(queue)
+        keys = list(queue)
+        for start in range(0, len(keys), self.max_batch_size):
+            batch = {key: queue[key] for key in keys[start:start + self.max_batch_size]}
+            task = asyncio.create_task(self._resolve(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, batch: dict[K, asyncio.Future]):
+        try:
+            values = await self.load_many(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        except BaseException:
+            for future in batch.values():
+                future.cancel()
+            raise
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(values.get(key))
+        finally:
+            for key in batch:
+                self._in_flight.pop(key, None)
+
+
+def _consume_exception(future: asyncio.Future):
+    # Callers may have given up waiting; mark the error as retrieved so asyncio
+    # does not log it as unhandled.
+    if not future.cancelled():
+        future.exception()
@@ -1,6 +1,52 @@
 import uuid
 from typing import Any
-from neo4j import AsyncSession
+from neo4j import AsyncSession, AsyncManagedTransaction, READ_ACCESS
+from app.core.database import driver, session_config
+from app.core.metrics import track_query
+from app.repositories.loader import BatchLoader
+
+CREATE_USER_QUERY = """
+CREATE (u:User {id: $id, username: $username, email: $email, password_hash: $password_hash})
+RETURN u {.*} AS user
+"""
+
+GET_USER_BY_USERNAME_QUERY = """
+MATCH (u:User {username: $username})
+RETURN u {.*} AS user
+"""
+
+GET_USER_BY_ID_QUERY = """
+MATCH (u:User {id: $user_id})
+RETURN u {.*} AS user
+"""
+
+GET_USERS_BY_ID_QUERY = """
+UNWIND $user_ids AS user_id
+MATCH (u:User {id: user_id})
+RETURN u {.*} AS user
+"""
+
+
+async def _fetch_user(
+    tx: AsyncManagedTransaction, name: str, query: str, params: dict[str, Any]
+) -> dict[str, Any] | None:
+    async with track_query(name, query, params) as tracker:
+        result = await tx.run(query, params)  # type: ignore[arg-type]
+        record = await result.single()
+        tracker.rows = 1 if record else 0
+        tracker.summary = await result.consume()
+    return dict(record["user"]) if record else None
+
+
+async def _fetch_users(
+    tx: AsyncManagedTransaction, name: str, query: str, params: dict[str, Any]
+) -> list[dict[str, Any]]:
+    async with track_query(name, query, params) as tracker:
+        result = await tx.run(query, params)  # type: ignore[arg-type]
+        users = [dict(record["user"]) async for record in result]
+        tracker.rows = len(users)
+        tracker.summary = await result.consume()
+    return users
 
 
 class UserRepository:
@@ -10,38 +56,31 @@ class UserRepository:
     async def create_user(
         self, username: str, email: str, password_hash: str
     ) -> dict[str, Any] | None:
-        user_id = str(uuid.uuid4())
-        query = """
-        CREATE (u:User {id: $id, username: $username, email: $email, password_hash: $password_hash})
-        RETURN u {.*} AS user
-        """
-        result = await self.session.run(
-            query,
-            id=user_id,
-            username=username,
-            email=email,
-            password_hash=password_hash,
+        params = {
+            "id": str(uuid.uuid4()),
+            "username": username,
+            "email": email,
+            "password_hash": password_hash,
+        }
+        return await self.session.execute_write(
+            _fetch_user, "create_user", CREATE_USER_QUERY, params
         )
-        record = await result.single()
-        return dict(record["user"]) if record else None
 
     async def get_user_by_username(self, username: str) -> dict[str, Any] | None:
-        query = """
-        MATCH (u:User {username: $username})
-        RETURN u {.*} AS user
-        """
-        result = await self.session.run(query, username=username)
-        record = await result.single()
-        return dict(record["user"]) if record else None
+        return await self.session.execute_read(
+            _fetch_user, "get_user_by_username", GET_USER_BY_USERNAME_QUERY, {"username": username}
+        )
 
     async def get_user_by_id(self, user_id: str) -> dict[str, Any] | None:
-        query = """
-        MATCH (u:User {id: $user_id})
-        RETURN u {.*} AS user
-        """
-        result = await self.session.run(query, user_id=user_id)
-        record = await result.single()
-        return dict(record["user"]) if record else None
+        return await self.session.execute_read(
+            _fetch_user, "get_user_by_id", GET_USER_BY_ID_QUERY, {"user_id": user_id}
+        )
+
+    async def get_users_by_id(self, user_ids: list[str]) -> dict[str, dict[str, Any]]:
+        users = await self.session.execute_read(
+            _fetch_users, "get_users_by_id", GET_USERS_BY_ID_QUERY, {"user_ids": user_ids}
+        )
+        return {user["id"]: user for user in users}
 
     @staticmethod
     def to_public_dict(user: dict[str, Any] | None) -> dict[str, Any] | None:
@@ -52,3 +91,11 @@ class UserRepository:
             "username": user["username"],
             "email": user["email"],
         }
+
+
+async def _load_users(user_ids: list[str]) -> dict[str, dict[str, Any]]:
+    async with driver.session(**session_config(READ_ACCESS)) as session:
+        return await UserRepository(session).get_users_by_id(user_ids)
+
+
+user_loader: BatchLoader[str, dict[str, Any]] = BatchLoader(_load_users)
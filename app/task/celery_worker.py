@@ -1,6 +1,11 @@
+import asyncio
 from celery import Celery
 from celery.schedules import crontab
+from billiard import current_process
+from celery.signals import worker_process_init, worker_ready
+from prometheus_client import start_http_server
 from app.core.config import settings
+from app.core.schema import bootstrap_schema
 
 celery_app = Celery(
     "car_app",
@@ -17,10 +22,33 @@ celery_app.conf.update(
 )
 
 from app.task.sync_cars import sync_cars_task
+from app.task.export_cars import export_cars_task
+from app.task.maintenance import clean_orphans_task
+
+
+@worker_ready.connect
+def migrate_schema(**kwargs):
+    asyncio.run(bootstrap_schema())
+
+
+@worker_process_init.connect
+def expose_metrics(**kwargs):
+    if settings.WORKER_METRICS_PORT is not None:
+        index = getattr(current_process(), "index", 0) or 0
+        start_http_server(settings.WORKER_METRICS_PORT + index)
+
 
 celery_app.conf.beat_schedule = {
     "sync-cars-every-5-min": {
         "task": "app.task.sync_cars.sync_cars",
         "schedule": crontab(minute="*/5"),
-    }
+    },
+    "clean-orphans-hourly": {
+        "task": "app.task.maintenance.clean_orphans",
+        "schedule": crontab(minute=17),
+    },
+    "recompute-stats-daily": {
+        "task": "app.task.sync_cars.recompute_stats",
+        "schedule": crontab(minute=41, hour=3),
+    },
 }
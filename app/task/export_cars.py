@@ -0,0 +1,61 @@
+import logging
+import os
+import time
+from neo4j import READ_ACCESS
+from app.core.config import settings
+from app.core.export import EXPORT_MEDIA_TYPES, export_chunks
+from app.repositories.car_repository import CarRepository
+from app.task.runtime import async_task, runtime
+from typing import Any, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+
+async def export_cars_logic(export_format: str, path: str | None = None) -> dict[str, Any]:
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    if path is None:
+        os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        path = os.path.join(settings.EXPORT_DIR, f"cars-{stamp}.{export_format}")
+    partial = f"{path}.partial"
+
+    started = time.perf_counter()
+    written = rows = 0
+
+    async def counted(source: AsyncIterator[dict[str, Any]]) -> AsyncIterator[dict[str, Any]]:
+        nonlocal rows
+        async for row in source:
+            rows += 1
+            yield row
+
+    try:
+        async with runtime.session(READ_ACCESS) as session:
+            repo = CarRepository(session)
+            with open(partial, "wb") as output:
+                async for chunk in export_chunks(counted(repo.export_cars()), export_format):
+                    output.write(chunk)
+                    written += len(chunk)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+    elapsed = time.perf_counter() - started
+    logger.info("Exported %d cars to %s: %d bytes in %.1fs", rows, path, written, elapsed)
+    return {
+        "path": path,
+        "format": export_format,
+        "rows": rows,
+        "bytes": written,
+        "seconds": round(elapsed, 3),
+    }
+
+
+@async_task(name="app.task.export_cars.export_cars")
+async def export_cars_task(
+    export_format: str = "parquet", path: str | None = None
+) -> dict[str, Any]:
+    return await export_cars_logic(export_format, path)
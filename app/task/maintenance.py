@@ -0,0 +1,39 @@
+import logging
+from typing import Any
+from app.core.config import settings
+from app.core.events import publish_catalog_changed
+from app.core.lock import RedisLock
+from app.repositories.car_repository import CarRepository
+from app.task.runtime import async_task, runtime
+from app.task.sync_cars import SYNC_LOCK_KEY
+
+logger = logging.getLogger(__name__)
+
+
+async def clean_orphans_logic() -> dict[str, Any] | None:
+    # Shares the sync lock: a sync run MERGEs models before attaching cars to
+    # them, and a freshly merged model must not be mistaken for an orphan.
+    lock = RedisLock(runtime.redis, SYNC_LOCK_KEY, settings.SYNC_LOCK_TTL_SECONDS * 1000)
+    if not await lock.acquire():
+        logger.info("Car sync is running, skipping orphan cleanup")
+        return None
+
+    try:
+        async with lock.hold():
+            async with runtime.session() as session:
+                repo = CarRepository(session)
+                models = await repo.delete_orphan_models(settings.MAINTENANCE_BATCH_SIZE)
+                makes = await repo.delete_orphan_makes(settings.MAINTENANCE_BATCH_SIZE)
+    finally:
+        await lock.release()
+
+    if models or makes:
+        # No car changed, so caches and versions stay; only name indexes reload.
+        await publish_catalog_changed(runtime.redis, [])
+    logger.info("Orphan cleanup removed %d models and %d makes", models, makes)
+    return {"models": models, "makes": makes}
+
+
+@async_task(name="app.task.maintenance.clean_orphans")
+async def clean_orphans_task() -> dict[str, Any] | None:
+    return await clean_orphans_logic()
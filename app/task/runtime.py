@@ -0,0 +1,118 @@
+import asyncio
+import functools
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+from celery.signals import worker_process_init, worker_process_shutdown
+from neo4j import AsyncDriver, AsyncSession, WRITE_ACCESS
+from redis.asyncio import Redis
+from app.core.cache import CarCache
+from app.core.config import settings
+from app.core.database import create_driver, session_config
+from app.task.celery_worker import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerRuntime:
+    # One event loop, Neo4j driver and Redis clients per worker process. They
+    # are created after the fork, so pooled connections are never shared with
+    # the parent or bound to a loop that has already been closed.
+    def __init__(self):
+        self.pid: int | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._driver: AsyncDriver | None = None
+        self._redis: Redis | None = None
+        self._cache_redis: Redis | None = None
+
+    @property
+    def driver(self) -> AsyncDriver:
+        self._ensure_started()
+        return self._driver  # type: ignore[return-value]
+
+    @property
+    def redis(self) -> Redis:
+        self._ensure_started()
+        return self._redis  # type: ignore[return-value]
+
+    @property
+    def cache(self) -> CarCache:
+        self._ensure_started()
+        return CarCache(self._cache_redis)  # type: ignore[arg-type]
+
+    def start(self):
+        if self.loop is not None and self.pid == os.getpid():
+            return
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._driver = create_driver()
+        self._redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self._cache_redis = (
+            Redis.from_url(settings.CACHE_REDIS_URL, decode_responses=True)
+            if settings.CACHE_REDIS_URL
+            else self._redis
+        )
+        logger.info("Worker runtime started in process %d", self.pid)
+
+    def stop(self):
+        if self.loop is None or self.pid != os.getpid():
+            return
+        try:
+            self.loop.run_until_complete(self._close())
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        finally:
+            self.loop.close()
+            self.loop = None
+            self._driver = None
+            self._redis = None
+            self._cache_redis = None
+            logger.info("Worker runtime stopped in process %d", self.pid)
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        self._ensure_started()
+        return self.loop.run_until_complete(coro)  # type: ignore[union-attr]
+
+    @asynccontextmanager
+    async def session(self, access_mode: str = WRITE_ACCESS) -> AsyncIterator[AsyncSession]:
+        async with self.driver.session(**session_config(access_mode)) as session:
+            yield session
+
+    def _ensure_started(self):
+        # Solo pools and eager calls never send worker_process_init, and a
+        # forked child must not reuse its parent's loop.
+        if self.loop is None or self.pid != os.getpid():
+            self.start()
+
+    async def _close(self):
+        if self._driver is not None:
+            await self._driver.close()
+        if self._cache_redis is not None and self._cache_redis is not self._redis:
+            await self._cache_redis.aclose()
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+runtime = WorkerRuntime()
+
+
+def async_task(*task_args: Any, **task_kwargs: Any):
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        @functools.wraps(func)
+        def run(*args: Any, **kwargs: Any) -> Any:
+            return runtime.run(func(*args, **kwargs))
+
+        return celery_app.task(*task_args, **task_kwargs)(run)
+
+    return decorator
+
+
+@worker_process_init.connect
+def start_runtime(**kwargs):
+    runtime.start()
+
+
+@worker_process_shutdown.connect
+def stop_runtime(**kwargs):
+    runtime.stop()
@@ -1,65 +1,433 @@
 # app/tasks/sync_cars.py
 import asyncio
+import hashlib
 import httpx
+import json
 import logging
-from app.task.celery_worker import celery_app
+import math
+import string
+import uuid
+from celery import chord
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+from redis.exceptions import ConnectionError as RedisConnectionError
 from app.core.config import settings
 from app.repositories.car_repository import CarRepository
-from neo4j import AsyncGraphDatabase
-from typing import AsyncGenerator
+from app.core.events import notify_catalog_changed
+from app.core.lock import RedisLock
+from app.core.metrics import SYNC_PHASE_DURATION
+from app.core.stats import CatalogStats
+from app.core.sync_runs import SyncRunStore, run_key
+from app.task.runtime import async_task, runtime
+from typing import Any, AsyncIterator
 
 logger = logging.getLogger(__name__)
 
-API_URL = "https://parseapi.back4app.com/classes/Car_Model_List?limit=10000"
-
-celery_driver = AsyncGraphDatabase.driver(
-    settings.NEO4J_URI,
-    auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+API_URL = "https://parseapi.back4app.com/classes/Car_Model_List"
+API_FIELDS = "objectId,Make,Model,Year"
+SYNC_SOURCE = "back4app"
+SYNC_LOCK_KEY = "sync:lock"
+OBJECT_ID_ALPHABET = string.digits + string.ascii_uppercase + string.ascii_lowercase
+RETRYABLE_ERRORS = (
+    httpx.HTTPError,
+    ServiceUnavailable,
+    SessionExpired,
+    TransientError,
+    RedisConnectionError,
 )
 
 
-async def get_celery_db() -> AsyncGenerator:
-    async with celery_driver.session() as session:
-        yield session
+def record_hash(make: str, model: str, year: int) -> str:
+    return hashlib.sha1(f"{make}\x1f{model}\x1f{year}".encode()).hexdigest()
+
+
+def normalize_records(cars_data: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    cars: list[dict[str, Any]] = []
+    for car in cars_data:
+        make = car.get("Make")
+        model = car.get("Model")
+        year = car.get("Year")
+        vin = car.get("objectId")
+
+        if not all([make, model, year, vin]):
+            logger.warning(f"Skipping incomplete car data: {car}")
+            continue
 
+        cars.append(
+            {
+                "id": vin,
+                "year": year,
+                "model_name": model,
+                "make_name": make,
+                "source": SYNC_SOURCE,
+                "hash": record_hash(make, model, year),
+            }
+        )
+    return cars
 
-@celery_app.task(name="app.tasks.sync_cars.sync_cars")
-def sync_cars_task():
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop.run_until_complete(sync_cars_logic())
-    loop.close()
 
+def build_catalog_rows(
+    cars: list[dict[str, Any]],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    makes: dict[str, dict[str, Any]] = {}
+    models: dict[tuple[str, str], dict[str, Any]] = {}
+    for car in cars:
+        make, model = car["make_name"], car["model_name"]
+        makes.setdefault(make, {"name": make})
+        models.setdefault((make, model), {"name": model, "make_name": make})
+    return list(makes.values()), list(models.values())
 
-async def sync_cars_logic():
+
+async def apply_batch(
+    repo: CarRepository, stats: CatalogStats, cars: list[dict[str, Any]]
+) -> tuple[dict[str, int], list[str]]:
+    existing = await repo.get_sync_state([car["id"] for car in cars])
+    changed = [
+        car for car in cars
+        if car["id"] not in existing or existing[car["id"]]["hash"] != car["hash"]
+    ]
+    replaced = [existing[car["id"]] for car in changed if car["id"] in existing]
+    inserted = len(changed) - len(replaced)
+
+    if changed:
+        makes, models = build_catalog_rows(changed)
+        await repo.bulk_upsert(makes, models, changed, batch_size=settings.SYNC_BATCH_SIZE)
+        await stats.record(added=changed, removed=replaced)
+
+    counts = {
+        "inserted": inserted,
+        "updated": len(changed) - inserted,
+        "unchanged": len(cars) - len(changed),
+    }
+    return counts, [car["id"] for car in changed]
+
+
+async def fetch_pages(
+    client: httpx.AsyncClient,
+    page_size: int,
+    lower: str | None = None,
+    upper: str | None = None,
+    after: str | None = None,
+) -> AsyncIterator[list[dict[str, Any]]]:
     headers = {
         "X-Parse-Application-Id": settings.CAR_API_ID,
         "X-Parse-Master-Key": settings.CAR_MASTER_KEY,
     }
+    last_id = after
 
-    try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(API_URL, headers=headers)
+    while True:
+        params: dict[str, Any] = {"limit": page_size, "order": "objectId", "keys": API_FIELDS}
+        bounds: dict[str, str] = {}
+        if last_id:
+            bounds["$gt"] = last_id
+        elif lower:
+            bounds["$gte"] = lower
+        if upper:
+            bounds["$lt"] = upper
+        if bounds:
+            params["where"] = json.dumps({"objectId": bounds})
+
+        with SYNC_PHASE_DURATION.labels("fetch").time():
+            resp = await client.get(API_URL, headers=headers, params=params)
             resp.raise_for_status()
-            cars_data = resp.json().get("results", [])
+            results = resp.json().get("results", [])
+        if not results:
+            return
+
+        yield results
+        if len(results) < page_size:
+            return
+        last_id = results[-1]["objectId"]
 
-        async for session in get_celery_db():
-            repo = CarRepository(session)
-            for car in cars_data:
-                make = car.get("Make")
-                model = car.get("Model")
-                year = car.get("Year")
-                vin = car.get("objectId")
 
-                if not all([make, model, year, vin]):
-                    logger.warning(f"Skipping incomplete car data: {car}")
-                    continue
+def plan_shards(shards: int) -> list[tuple[str | None, str | None]]:
+    # Parse objectIds are alphanumeric and sort bytewise, so contiguous runs of
+    # first characters split the key space into disjoint ranges. The outer
+    # ranges are left open so unexpected ids are still covered.
+    shards = max(1, min(shards, len(OBJECT_ID_ALPHABET)))
+    step, extra = divmod(len(OBJECT_ID_ALPHABET), shards)
+    starts, position = [], 0
+    for shard in range(shards):
+        starts.append(OBJECT_ID_ALPHABET[position])
+        position += step + (shard < extra)
+    lowers: list[str | None] = [None, *starts[1:]]
+    uppers: list[str | None] = [*starts[1:], None]
+    return list(zip(lowers, uppers))
 
-                await repo.create_make(make)
-                await repo.create_model(model, make)
-                await repo.create_car(vin, year, model, make)
 
-        logger.info("Car sync completed: %d cars processed", len(cars_data))
+def sync_lock(run_id: str) -> RedisLock:
+    return RedisLock(
+        runtime.redis, SYNC_LOCK_KEY, settings.SYNC_LOCK_TTL_SECONDS * 1000, token=run_id
+    )
 
+
+class PageCommitter:
+    # Writers finish pages out of order. A page's counts and last objectId are
+    # checkpointed only once every page before it is written too, so resuming
+    # after the checkpoint never skips an unwritten page.
+    def __init__(self, store: SyncRunStore, run_id: str, index: int):
+        self.store = store
+        self.run_id = run_id
+        self.index = index
+        self.next_page = 0
+        self.done: dict[int, tuple[str, dict[str, int]]] = {}
+        self.lock = asyncio.Lock()
+
+    async def commit(self, page: int, last_object_id: str, counts: dict[str, int]):
+        async with self.lock:
+            self.done[page] = (last_object_id, counts)
+            committed: dict[str, int] = {}
+            last_committed: str | None = None
+            pages = 0
+            while self.next_page in self.done:
+                last_committed, page_counts = self.done.pop(self.next_page)
+                for key, value in page_counts.items():
+                    committed[key] = committed.get(key, 0) + value
+                self.next_page += 1
+                pages += 1
+            if last_committed is not None:
+                await self.store.commit_pages(
+                    self.run_id, self.index, last_committed, pages, committed
+                )
+
+
+async def sync_shard_logic(run_id: str, index: int) -> dict[str, Any]:
+    store = SyncRunStore(runtime.redis)
+    checkpoint = await store.shard(run_id, index)
+    if checkpoint.get("status") == "done":
+        return checkpoint
+
+    queue: asyncio.Queue[tuple[int, str, list[dict[str, Any]], int] | None] = asyncio.Queue(
+        maxsize=settings.SYNC_QUEUE_SIZE
+    )
+    stats = CatalogStats(runtime.redis)
+    committer = PageCommitter(store, run_id, index)
+    seen_key, changed_key = run_key(run_id, "seen"), run_key(run_id, "changed")
+    lower, upper, after = checkpoint.get("lower"), checkpoint.get("upper"), checkpoint.get("last_object_id")
+
+    async def produce():
+        async with httpx.AsyncClient() as client:
+            pages = fetch_pages(client, settings.SYNC_PAGE_SIZE, lower, upper, after)
+            page = 0
+            async for results in pages:
+                with SYNC_PHASE_DURATION.labels("transform").time():
+                    cars = normalize_records(results)
+                if cars:
+                    async with runtime.redis.pipeline(transaction=False) as pipe:
+                        pipe.sadd(seen_key, *(car["id"] for car in cars))
+                        pipe.expire(seen_key, settings.SYNC_RUN_TTL_SECONDS)
+                        await pipe.execute()
+                await queue.put((page, results[-1]["objectId"], cars, len(results)))
+                page += 1
+        for _ in range(settings.SYNC_WRITERS):
+            await queue.put(None)
+
+    async def write():
+        async with runtime.session() as session:
+            repo = CarRepository(session)
+            while (item := await queue.get()) is not None:
+                page, last_object_id, cars, fetched = item
+                with SYNC_PHASE_DURATION.labels("write").time():
+                    counts, changed = await apply_batch(repo, stats, cars)
+                if changed:
+                    async with runtime.redis.pipeline(transaction=False) as pipe:
+                        pipe.sadd(changed_key, *changed)
+                        pipe.expire(changed_key, settings.SYNC_RUN_TTL_SECONDS)
+                        await pipe.execute()
+                await committer.commit(
+                    page,
+                    last_object_id,
+                    {"fetched": fetched, "skipped": fetched - len(cars), **counts},
+                )
+
+    await store.set_shard(run_id, index, status="running", error="")
+    try:
+        async with sync_lock(run_id).hold():
+            async with asyncio.TaskGroup() as group:
+                group.create_task(produce())
+                for _ in range(settings.SYNC_WRITERS):
+                    group.create_task(write())
     except Exception as e:
-        logger.error(f"Error during car sync: {e}", exc_info=True)
+        # Unwrap the TaskGroup's ExceptionGroup so autoretry_for can match it.
+        error = e.exceptions[0] if isinstance(e, ExceptionGroup) else e
+        await store.set_shard(run_id, index, status="failed", error=repr(error))
+        raise error
+
+    await store.set_shard(run_id, index, status="done")
+    checkpoint = await store.shard(run_id, index)
+    logger.info("Sync run %s shard %d [%s, %s) done: %s", run_id, index, lower, upper, checkpoint)
+    return checkpoint
+
+
+async def find_stale_ids(
+    repo: CarRepository, seen_key: str, seen_count: int, expected: int
+) -> tuple[list[str], str | None]:
+    # Deleting is only safe when the seen set is known to be complete. A set
+    # that lost members (expiry, eviction, a partial write) would otherwise
+    # turn every missing car into a deletion.
+    if seen_count != expected:
+        return [], f"seen set has {seen_count} ids but shards checkpointed {expected}"
+
+    # Synced cars are paged out of Neo4j and checked against the Redis set, so
+    # neither side is loaded whole. stale / (seen + stale) > fraction is
+    # rewritten as a bound on stale alone, which stops the scan early.
+    fraction = settings.SYNC_MAX_STALE_FRACTION
+    max_stale = seen_count * fraction / (1 - fraction) if fraction < 1 else math.inf
+    stale_ids: list[str] = []
+    async for page in repo.iter_source_car_ids(SYNC_SOURCE, settings.SYNC_BATCH_SIZE):
+        flags = await runtime.redis.smismember(seen_key, page)
+        stale_ids.extend(car_id for car_id, seen in zip(page, flags) if not seen)
+        if len(stale_ids) > max_stale:
+            return [], (
+                f"at least {len(stale_ids)} of {seen_count + len(stale_ids)} synced cars "
+                f"are stale, above SYNC_MAX_STALE_FRACTION={fraction}"
+            )
+    return stale_ids, None
+
+
+async def finish_sync_logic(run_id: str) -> dict[str, Any]:
+    # Runs only when every shard succeeded, so the seen set should cover the
+    # whole source; it is checked against the shard checkpoints before anything
+    # missing from it is deleted.
+    store = SyncRunStore(runtime.redis)
+    summary: dict[str, Any] = {"run_id": run_id, **await store.totals(run_id), "deleted": 0}
+
+    # Failures propagate so Celery can retry; once retries are exhausted the
+    # abort_sync errback marks the run failed and releases the lock.
+    lock = sync_lock(run_id)
+    async with lock.hold():
+        # No shard is writing while the lock is held, so a first-time seed
+        # counts every car exactly once.
+        await CatalogStats(runtime.redis).ensure_seeded(runtime.driver)
+        seen_key = run_key(run_id, "seen")
+        seen_count = await runtime.redis.scard(seen_key)
+        expected = summary["fetched"] - summary["skipped"]
+        changed_ids = set(await runtime.redis.smembers(run_key(run_id, "changed")))
+
+        async with runtime.session() as session:
+            repo = CarRepository(session)
+            with SYNC_PHASE_DURATION.labels("reconcile").time():
+                stale_ids, blocker = await find_stale_ids(repo, seen_key, seen_count, expected)
+                if blocker:
+                    logger.error("Car sync %s: skipping reconcile, %s", run_id, blocker)
+                    summary["reconcile_skipped"] = blocker
+                elif stale_ids:
+                    deleted = await repo.delete_cars(
+                        stale_ids, batch_size=settings.SYNC_BATCH_SIZE
+                    )
+                    await CatalogStats(runtime.redis).record(removed=deleted)
+                    summary["deleted"] = len(deleted)
+                    changed_ids.update(stale_ids)
+
+        if changed_ids:
+            await notify_catalog_changed(runtime.redis, changed_ids, runtime.cache)
+
+        await store.finish(
+            run_id,
+            deleted=summary["deleted"],
+            reconcile_skipped=summary.get("reconcile_skipped", ""),
+        )
+        await runtime.redis.delete(run_key(run_id, "seen"), run_key(run_id, "changed"))
+    await lock.release()
+
+    logger.info(
+        "Car sync %s completed: %d records fetched, %d inserted, %d updated, "
+        "%d unchanged, %d deleted",
+        run_id,
+        summary["fetched"],
+        summary["inserted"],
+        summary["updated"],
+        summary["unchanged"],
+        summary["deleted"],
+    )
+    return summary
+
+
+async def abort_sync_logic(run_id: str):
+    # The run's checkpoints and seen set are kept, so the next run resumes it.
+    logger.error("Car sync %s failed, skipping reconcile", run_id)
+    await SyncRunStore(runtime.redis).fail(run_id)
+    await sync_lock(run_id).release()
+
+
+async def start_sync_logic() -> dict[str, Any] | None:
+    store = SyncRunStore(runtime.redis)
+    resumed = await store.resumable()
+    run_id = resumed or uuid.uuid4().hex
+    lock = sync_lock(run_id)
+    if not await lock.acquire():
+        logger.info("Car sync already running as %s, skipping", await lock.owner())
+        return None
+
+    try:
+        if resumed:
+            pending = await store.resume(run_id)
+        else:
+            shards = plan_shards(settings.SYNC_SHARDS)
+            await store.create(run_id, shards)
+            pending = list(range(len(shards)))
+
+        callback = finish_sync_task.s(run_id).on_error(abort_sync_task.si(run_id))
+        if pending:
+            chord(sync_shard_task.s(run_id, index) for index in pending)(callback)
+        else:
+            callback.delay([])
+    except Exception:
+        await lock.release()
+        raise
+
+    logger.info(
+        "Car sync %s %s with %d pending shards",
+        run_id,
+        "resumed" if resumed else "started",
+        len(pending),
+    )
+    return {"run_id": run_id, "resumed": bool(resumed), "shards": len(pending)}
+
+
+@async_task(name="app.task.sync_cars.sync_cars")
+async def sync_cars_task() -> dict[str, Any] | None:
+    return await start_sync_logic()
+
+
+@async_task(
+    name="app.task.sync_cars.sync_shard",
+    autoretry_for=RETRYABLE_ERRORS,
+    retry_backoff=True,
+    retry_backoff_max=settings.SYNC_RETRY_BACKOFF_MAX_SECONDS,
+    retry_jitter=True,
+    max_retries=settings.SYNC_MAX_RETRIES,
+)
+async def sync_shard_task(run_id: str, index: int) -> dict[str, Any]:
+    return await sync_shard_logic(run_id, index)
+
+
+@async_task(
+    name="app.task.sync_cars.finish_sync",
+    autoretry_for=RETRYABLE_ERRORS,
+    retry_backoff=True,
+    retry_backoff_max=settings.SYNC_RETRY_BACKOFF_MAX_SECONDS,
+    retry_jitter=True,
+    max_retries=settings.SYNC_MAX_RETRIES,
+)
+async def finish_sync_task(results: list[dict[str, Any]], run_id: str) -> dict[str, Any]:
+    return await finish_sync_logic(run_id)
+
+
+@async_task(name="app.task.sync_cars.abort_sync")
+async def abort_sync_task(run_id: str):
+    await abort_sync_logic(run_id)
+
+
+@async_task(name="app.task.sync_cars.recompute_stats")
+async def recompute_stats_task() -> int | None:
+    # Shares the sync lock: shards record deltas while they write, and a scan
+    # taken mid-run would count their pages twice.
+    lock = RedisLock(runtime.redis, SYNC_LOCK_KEY, settings.SYNC_LOCK_TTL_SECONDS * 1000)
+    if not await lock.acquire():
+        logger.info("Car sync is running, skipping stats recompute")
+        return None
+    try:
+        async with lock.hold():
+            return await CatalogStats(runtime.redis).recompute(runtime.driver)
+    finally:
+        await lock.release()
@@ -0,0 +1,119 @@
+"""Measure full-catalog export throughput and memory on a synthetic graph.
+
+Seeds Car/CarModel/Make nodes tagged with source "benchmark" (10M cars by
+default), then streams the export in each format straight from Neo4j through
+the same encoders the API and the export task use, e.g.:
+
+    python benchmarks/export_throughput.py --seed --cars 10000000
+    python benchmarks/export_throughput.py --formats csv ndjson parquet
+    python benchmarks/export_throughput.py --cleanup
+"""
+import argparse
+import asyncio
+import resource
+import sys
+import time
+from pathlib import Path
+
+from neo4j import READ_ACCESS
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.database import create_driver, session_config  # noqa: E402
+from app.core.export import export_chunks  # noqa: E402
+from app.repositories.car_repository import CarRepository  # noqa: E402
+
+SEED_BATCH = 50000
+MAKES = 60
+MODELS_PER_MAKE = 40
+
+SEED_CATALOG_QUERY = """
+UNWIND range(0, $makes - 1) AS m
+MERGE (make:Make {name: 'Make ' + m})
+WITH make, m
+UNWIND range(0, $models - 1) AS n
+MERGE (model:CarModel {make_name: make.name, name: 'Model ' + m + '-' + n})
+MERGE (model)-[:BELONGS_TO]->(make)
+"""
+
+SEED_CARS_QUERY = """
+UNWIND range($start, $end - 1) AS i
+WITH i, 'Make ' + (i % $makes) AS make_name
+MATCH (model:CarModel {make_name: make_name, name: 'Model ' + (i % $makes) + '-' + (i % $models)})
+CREATE (:Car {id: 'bench-' + i, year: 2000 + i % 25, source: 'benchmark'})-[:INSTANCE_OF]->(model)
+"""
+
+CLEANUP_QUERY = """
+MATCH (c:Car {source: 'benchmark'})
+CALL { WITH c DETACH DELETE c } IN TRANSACTIONS OF 50000 ROWS
+"""
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def seed(driver, cars: int):
+    async with driver.session(**session_config()) as session:
+        await (await session.run(SEED_CATALOG_QUERY, makes=MAKES, models=MODELS_PER_MAKE)).consume()
+        started = time.perf_counter()
+        for start in range(0, cars, SEED_BATCH):
+            end = min(start + SEED_BATCH, cars)
+            result = await session.run(
+                SEED_CARS_QUERY, start=start, end=end, makes=MAKES, models=MODELS_PER_MAKE
+            )
+            await result.consume()
+            print(f"\rseeded {end:,}/{cars:,} cars", end="", flush=True)
+    print(f"\nseeding took {time.perf_counter() - started:.1f}s")
+
+
+async def cleanup(driver):
+    async with driver.session(**session_config()) as session:
+        summary = await (await session.run(CLEANUP_QUERY)).consume()
+    print(f"deleted {summary.counters.nodes_deleted:,} benchmark cars")
+
+
+async def measure(driver, export_format: str):
+    rows = written = 0
+
+    async def counted(source):
+        nonlocal rows
+        async for row in source:
+            rows += 1
+            yield row
+
+    started = time.perf_counter()
+    async with driver.session(**session_config(READ_ACCESS)) as session:
+        repo = CarRepository(session)
+        async for chunk in export_chunks(counted(repo.export_cars()), export_format):
+            written += len(chunk)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{export_format:>8}: {rows:12,d} rows in {elapsed:8.1f}s "
+        f"{rows / elapsed:10,.0f} rows/s {written / elapsed / 2**20:7.1f} MiB/s "
+        f"size={written / 2**20:9.1f} MiB peak_rss={peak_rss_mb():7.1f} MiB"
+    )
+
+
+async def main(args: argparse.Namespace):
+    driver = create_driver()
+    try:
+        if args.cleanup:
+            await cleanup(driver)
+            return
+        if args.seed:
+            await seed(driver, args.cars)
+        for export_format in args.formats:
+            await measure(driver, export_format)
+    finally:
+        await driver.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", action="store_true", help="create the synthetic graph first")
+    parser.add_argument("--cars", type=int, default=10_000_000)
+    parser.add_argument("--formats", nargs="+", default=["ndjson", "csv", "parquet"])
+    parser.add_argument("--cleanup", action="store_true", help="delete the benchmark cars")
+    asyncio.run(main(parser.parse_args()))
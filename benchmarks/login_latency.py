@@ -0,0 +1,93 @@
+"""Measure GET /cars/ latency while concurrent logins hash passwords.
+
+Run against a live API, e.g.:
+
+    python benchmarks/login_latency.py --base-url http://localhost:8000 --logins 16
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def ensure_user(client: httpx.AsyncClient, username: str, password: str) -> str:
+    await client.post(
+        "/users/register",
+        json={"username": username, "email": f"{username}@example.com", "password": password},
+    )
+    resp = await client.post("/users/login", json={"username": username, "password": password})
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+async def sample_reads(
+    client: httpx.AsyncClient, token: str, duration: float
+) -> list[float]:
+    latencies = []
+    headers = {"Authorization": f"Bearer {token}"}
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        resp = await client.get("/cars/", headers=headers)
+        resp.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def login_loop(
+    client: httpx.AsyncClient, username: str, password: str, stop: asyncio.Event
+) -> int:
+    count = 0
+    while not stop.is_set():
+        await client.post("/users/login", json={"username": username, "password": password})
+        count += 1
+    return count
+
+
+def report(label: str, latencies: list[float]):
+    print(
+        f"{label:>14}: n={len(latencies):5d} "
+        f"p50={statistics.median(latencies):7.2f}ms "
+        f"p95={percentile(latencies, 95):7.2f}ms "
+        f"p99={percentile(latencies, 99):7.2f}ms"
+    )
+
+
+async def main(base_url: str, logins: int, duration: float):
+    username = f"bench-{uuid.uuid4().hex[:8]}"
+    password = "bench-password"
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        token = await ensure_user(client, username, password)
+
+        report("idle", await sample_reads(client, token, duration))
+
+        stop = asyncio.Event()
+        workers = [
+            asyncio.create_task(login_loop(client, username, password, stop))
+            for _ in range(logins)
+        ]
+        loaded = await sample_reads(client, token, duration)
+        stop.set()
+        completed = sum(await asyncio.gather(*workers))
+
+        report(f"{logins} logins", loaded)
+        print(f"{'logins/s':>14}: {completed / duration:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=16, help="concurrent login loops")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per phase")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.logins, args.duration))
@@ -1,15 +1,44 @@
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 from app.api import router as api_router
-from app.core.database import close_driver
+from app.core.database import close_driver, driver, warm_up
+from app.core.cache import close_cache
+from app.core.config import settings
+from app.core.events import catalog_listener
+from app.core.metrics import MetricsMiddleware
+from app.core.query_log import slow_query_log
+from app.repositories.catalog_search import catalog_search
+from app.repositories.catalog_snapshot import catalog_snapshot
+from app.core.schema import apply_migrations
+from app.core.security import password_hasher
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    slow_query_log.driver = driver
+    await apply_migrations(driver)
+    await warm_up()
+    # Subscribe before the initial loads so no change made meanwhile is lost.
+    if settings.CATALOG_SNAPSHOT_ENABLED:
+        catalog_listener.add_handler(catalog_snapshot.on_catalog_changed)
+    catalog_listener.add_handler(catalog_search.on_catalog_changed)
+    catalog_listener.start()
+    await catalog_listener.wait_subscribed()
+    if settings.CATALOG_SNAPSHOT_ENABLED:
+        await catalog_snapshot.load(driver)
+    await catalog_search.load(driver)
     yield
+    await catalog_listener.stop()
+    await catalog_snapshot.close()
+    await catalog_search.close()
+    password_hasher.shutdown()
+    await close_cache()
     await close_driver()
 
 app = FastAPI(title="Car API with Neo4j", lifespan=lifespan)
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")